@@ -5,28 +5,44 @@ A dataset can contain multiple resources each of which are loaded independently.
 """
 
 import glob
+import gzip
 import hashlib
+import io
 import json
+import math
 import os.path
 import pathlib
-from collections.abc import Iterable
+import weakref
+from collections.abc import Iterable, Mapping, Sequence
 from typing import Any, cast
 
 import datapackage
+import numpy as np
 import pandas as pd
 import pooch
 import scmdata
 
-from bookshelf.schema import Edition, NotebookMetadata, Version
+from bookshelf.schema import DimensionStatistics, Edition, NotebookMetadata, ResourceStatistics, Version
 from bookshelf.utils import (
     build_url,
     create_local_cache,
     fetch_file,
-    get_remote_bookshelf,
+    get_remote_bookshelves,
+    mark_accessed,
+    stream_file,
 )
 
 DATAPACKAGE_FILENAME = "datapackage.json"
 
+_OPEN_BOOKS: "weakref.WeakSet[LocalBook]" = weakref.WeakSet()
+
+Aggregation = Mapping[str, str | Mapping[str, str]]
+"""
+Mapping of dimension to new values for that dimension
+
+See [aggregate_timeseries][bookshelf.book.aggregate_timeseries].
+"""
+
 
 class _Book:
     def __init__(
@@ -34,12 +50,13 @@ class _Book:
         name: str,
         version: str,
         edition: int,
-        bookshelf: str | None = None,
+        bookshelf: str | Sequence[str] | None = None,
     ):
         self.name = name
         self.version = version
         self.edition = edition
-        self.bookshelf = get_remote_bookshelf(bookshelf)
+        self.bookshelves = get_remote_bookshelves(bookshelf)
+        self.bookshelf = self.bookshelves[0]
 
     def long_version(self) -> str:
         """
@@ -134,6 +151,25 @@ class _Book:
             *self.path_parts(self.name, self.version, self.edition, fname),
         )
 
+    def urls(self, fname: str | None = None) -> list[str]:
+        """
+        Get the expected URLs for the book on the remote bookshelf and any mirrors
+
+        Parameters
+        ----------
+        fname : str
+            If provided get the URLs of a file within the Book
+
+        Returns
+        -------
+        list of str
+            URLs in order of preference
+        """
+        return [
+            build_url(bookshelf, *self.path_parts(self.name, self.version, self.edition, fname))
+            for bookshelf in self.bookshelves
+        ]
+
 
 class LocalBook(_Book):
     """
@@ -151,20 +187,25 @@ class LocalBook(_Book):
     version of the `Book`.
     """
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         name: str,
         version: str,
         edition: int = 1,
         local_bookshelf: str | pathlib.Path | None = None,
+        shared_bookshelves: Sequence[str | pathlib.Path] = (),
+        bookshelf: str | Sequence[str] | None = None,
     ):
-        super().__init__(name, version, edition)
+        super().__init__(name, version, edition, bookshelf=bookshelf)
 
         if local_bookshelf is None:
             local_bookshelf = create_local_cache(local_bookshelf)
         self.local_bookshelf = pathlib.Path(local_bookshelf)
+        self.shared_bookshelves = [pathlib.Path(p) for p in shared_bookshelves]
         self._metadata: datapackage.Package | None = None
 
+        _OPEN_BOOKS.add(self)
+
     def hash(self) -> str:
         """
         Get the hash for the metadata
@@ -213,6 +254,7 @@ class LocalBook(_Book):
             local_fname = self.local_fname(fname)
             with open(local_fname) as file_handle:
                 file_data = json.load(file_handle)
+            mark_accessed(local_fname)
 
             self._metadata = datapackage.Package(file_data)
         return self._metadata
@@ -245,7 +287,12 @@ class LocalBook(_Book):
         return file_list
 
     def add_timeseries(
-        self, timeseries_name: str, data: scmdata.ScmRun, compressed: bool = True, write_long: bool = True
+        self,
+        timeseries_name: str,
+        data: scmdata.ScmRun,
+        compressed: bool = True,
+        write_long: bool = True,
+        aggregations: Mapping[str, Aggregation] | None = None,
     ) -> None:
         """
         Add two timeseries resource (wide format and long format) to the Book
@@ -262,18 +309,39 @@ class LocalBook(_Book):
             Whether compressed the file or not
         write_long: bool
             Whether to write the long format timeseries data or not
+        aggregations: dict
+            Aggregations of the data to precompute, keyed by the name of the aggregation
+
+            Each aggregation is computed using [aggregate_timeseries][bookshelf.book.aggregate_timeseries]
+            and stored as additional resources which can be read using the `aggregate`
+            argument of [timeseries][bookshelf.LocalBook.timeseries] and
+            [get_long_format_data][bookshelf.LocalBook.get_long_format_data].
         """
         if compressed:
             compression_info = {"format": "csv.gz", "compression": "gzip"}
         else:
             compression_info = {"format": "csv", "compression": "infer"}
 
-        self.write_wide_timeseries(data, timeseries_name, compression_info)
-        if write_long:
-            self.write_long_timeseries(data, timeseries_name, compression_info)
+        datasets: dict[str | None, scmdata.ScmRun] = {None: data}
+        for name, aggregation in (aggregations or {}).items():
+            datasets[name] = aggregate_timeseries(data, aggregation)
+
+        # Check all the resources before writing any of them
+        for aggregate in datasets:
+            for shape in ["wide", "long"] if write_long else ["wide"]:
+                self._check_new_resource(timeseries_name, shape, compression_info["format"], aggregate)
+
+        for aggregate, dataset in datasets.items():
+            self.write_wide_timeseries(dataset, timeseries_name, compression_info, aggregate=aggregate)
+            if write_long:
+                self.write_long_timeseries(dataset, timeseries_name, compression_info, aggregate=aggregate)
 
     def write_wide_timeseries(
-        self, data: scmdata.ScmRun, timeseries_name: str, compression_info: dict[str, str]
+        self,
+        data: scmdata.ScmRun,
+        timeseries_name: str,
+        compression_info: dict[str, str],
+        aggregate: str | None = None,
     ) -> None:
         """
         Add the wide format timeseries data to the Book
@@ -286,42 +354,47 @@ class LocalBook(_Book):
             Name of the resource
         compression_info: dict
             A dictionary about the format of the file and the compression type
+        aggregate: str
+            If provided, the name of the aggregation that `data` contains
         """
         shape = "wide"
+        name, fname = self._check_new_resource(timeseries_name, shape, compression_info["format"], aggregate)
         metadata = self.as_datapackage()
 
-        name = get_resource_key(timeseries_name=timeseries_name, shape=shape)
-        fname = get_resource_filename(
-            book_name=self.name,
-            long_version=self.long_version(),
-            timeseries_name=timeseries_name,
-            shape=shape,
-            file_format=compression_info["format"],
-        )
-
         timeseries_data = pd.DataFrame(data.timeseries().sort_index())
 
-        timeseries_data.to_csv(  # type: ignore
-            path_or_buf=self.local_fname(fname),
-            compression=compression_info["compression"],
+        uncompressed_bytes = _write_csv(
+            timeseries_data, self.local_fname(fname), compression_info["compression"]
         )
         resource_hash = pooch.hashes.file_hash(self.local_fname(fname))
         content_hash = hashlib.sha256(timeseries_data.to_csv().encode()).hexdigest()
-        metadata.add_resource(
-            {
-                "name": name,
-                "timeseries_name": timeseries_name,
-                "shape": shape,
-                "format": compression_info["format"],
-                "filename": fname,
-                "hash": resource_hash,
-                "content_hash": content_hash,
-            }
+        statistics = get_resource_statistics(
+            data,
+            self.local_fname(fname),
+            row_count=len(timeseries_data),
+            uncompressed_bytes=uncompressed_bytes,
         )
+        descriptor: dict[str, Any] = {
+            "name": name,
+            "timeseries_name": timeseries_name,
+            "shape": shape,
+            "format": compression_info["format"],
+            "filename": fname,
+            "hash": resource_hash,
+            "content_hash": content_hash,
+            "statistics": statistics.model_dump(),
+        }
+        if aggregate is not None:
+            descriptor["aggregate"] = aggregate
+        metadata.add_resource(descriptor)
         metadata.save(self.local_fname(DATAPACKAGE_FILENAME))
 
     def write_long_timeseries(
-        self, data: scmdata.ScmRun, timeseries_name: str, compression_info: dict[str, str]
+        self,
+        data: scmdata.ScmRun,
+        timeseries_name: str,
+        compression_info: dict[str, str],
+        aggregate: str | None = None,
     ) -> None:
         """
         Add the long format timeseries data to the Book
@@ -334,6 +407,8 @@ class LocalBook(_Book):
             Name of the resource
         compression_info: dict
             A dictionary about the format of the file and the compression type
+        aggregate: str
+            If provided, the name of the aggregation that `data` contains
         """
 
         def chunked_melt(
@@ -376,41 +451,39 @@ class LocalBook(_Book):
             return melt_df
 
         shape = "long"
+        name, fname = self._check_new_resource(timeseries_name, shape, compression_info["format"], aggregate)
         metadata = self.as_datapackage()
 
-        name = get_resource_key(timeseries_name=timeseries_name, shape=shape)
-        fname = get_resource_filename(
-            book_name=self.name,
-            long_version=self.long_version(),
-            timeseries_name=timeseries_name,
-            shape=shape,
-            file_format=compression_info["format"],
-        )
-
         var_lst = list(data.meta.columns)
         sort_lst = [*var_lst, "year"]
         data_df = pd.DataFrame(data.timeseries().sort_index().reset_index())
         data_melt = chunked_melt(data_df, var_lst, "year", "values").sort_values(by=sort_lst)
-        data_melt.to_csv(  # type: ignore
-            path_or_buf=self.local_fname(fname),
+        uncompressed_bytes = _write_csv(
+            data_melt,
+            self.local_fname(fname),
+            compression_info["compression"],
             sep=",",
             index=False,
             header=True,
-            compression=compression_info["compression"],
         )
         resource_hash = pooch.hashes.file_hash(self.local_fname(fname))
         content_hash = hashlib.sha256(data_melt.to_csv().encode()).hexdigest()
-        metadata.add_resource(
-            {
-                "name": name,
-                "timeseries_name": timeseries_name,
-                "shape": shape,
-                "format": compression_info["format"],
-                "filename": fname,
-                "hash": resource_hash,
-                "content_hash": content_hash,
-            }
+        statistics = get_resource_statistics(
+            data, self.local_fname(fname), row_count=len(data_melt), uncompressed_bytes=uncompressed_bytes
         )
+        descriptor: dict[str, Any] = {
+            "name": name,
+            "timeseries_name": timeseries_name,
+            "shape": shape,
+            "format": compression_info["format"],
+            "filename": fname,
+            "hash": resource_hash,
+            "content_hash": content_hash,
+            "statistics": statistics.model_dump(),
+        }
+        if aggregate is not None:
+            descriptor["aggregate"] = aggregate
+        metadata.add_resource(descriptor)
         metadata.save(self.local_fname(DATAPACKAGE_FILENAME))
 
     @classmethod
@@ -463,7 +536,43 @@ class LocalBook(_Book):
 
         return book
 
-    def timeseries(self, timeseries_name: str) -> scmdata.ScmRun:
+    def resource_statistics(
+        self, timeseries_name: str, shape: str = "wide", aggregate: str | None = None
+    ) -> ResourceStatistics | None:
+        """
+        Get the statistics of a resource
+
+        The statistics are read from the Book's metadata so the resource itself
+        does not need to be fetched.
+
+        Parameters
+        ----------
+        timeseries_name : str
+            Name of the resource
+        shape : str
+            Shape of the resource ("wide" or "long")
+        aggregate : str
+            If provided, get the statistics of a precomputed aggregation of the resource
+
+        Raises
+        ------
+        ValueError
+            The resource doesn't exist
+
+        Returns
+        -------
+        :
+            Statistics of the resource or None if the resource was written without statistics
+        """
+        resource = self._get_resource(timeseries_name, shape, aggregate)
+        statistics = resource.descriptor.get("statistics")
+        if statistics is None:
+            return None
+        return ResourceStatistics(**statistics)
+
+    def timeseries(
+        self, timeseries_name: str, cache: bool = True, aggregate: str | None = None
+    ) -> scmdata.ScmRun:
         """
         Get a timeseries resource
 
@@ -474,6 +583,15 @@ class LocalBook(_Book):
         ----------
         timeseries_name : str
             Name of the resource
+        cache : bool
+            If False, a resource that isn't in the local cache is read directly from
+            the remote BookShelf without being stored locally.
+
+            The hash of the resource is verified as it is read
+            and a ValueError is raised if it doesn't match.
+        aggregate : str
+            If provided, get an aggregation of the resource that was precomputed
+            when the resource was added (see [add_timeseries][bookshelf.LocalBook.add_timeseries])
 
         Returns
         -------
@@ -481,21 +599,16 @@ class LocalBook(_Book):
             Timeseries data
 
         """
-        timeseries_shape = "wide"
-        key_name = get_resource_key(timeseries_name=timeseries_name, shape=timeseries_shape)
-        resource: datapackage.Resource = self.as_datapackage().get_resource(key_name)
-        if resource is None:
-            raise ValueError(f"Unknown timeseries '{key_name}'")
-        local_fname = self.local_fname(resource.descriptor["filename"])
-        fetch_file(
-            self.url(resource.descriptor.get("filename")),
-            pathlib.Path(local_fname),
-            known_hash=resource.descriptor.get("hash"),
-        )
+        if not cache:
+            return scmdata.ScmRun(self._read_resource(timeseries_name, shape="wide", aggregate=aggregate))
+
+        local_fname = self.fetch_resource(timeseries_name, shape="wide", aggregate=aggregate)
 
         return scmdata.ScmRun(local_fname)
 
-    def get_long_format_data(self, timeseries_name: str) -> pd.DataFrame:
+    def get_long_format_data(
+        self, timeseries_name: str, cache: bool = True, aggregate: str | None = None
+    ) -> pd.DataFrame:
         """
         Get a timeseries resource in long format
 
@@ -506,6 +619,15 @@ class LocalBook(_Book):
         ----------
         timeseries_name : str
             Name of the volume
+        cache : bool
+            If False, a resource that isn't in the local cache is read directly from
+            the remote BookShelf without being stored locally.
+
+            The hash of the resource is verified as it is read
+            and a ValueError is raised if it doesn't match.
+        aggregate : str
+            If provided, get an aggregation of the resource that was precomputed
+            when the resource was added (see [add_timeseries][bookshelf.LocalBook.add_timeseries])
 
         Returns
         -------
@@ -513,21 +635,110 @@ class LocalBook(_Book):
             Timeseries data
 
         """
-        timeseries_shape = "long"
-        key_name = get_resource_key(timeseries_name=timeseries_name, shape=timeseries_shape)
-        resource: datapackage.Resource = self.as_datapackage().get_resource(key_name)
-        if resource is None:
-            raise ValueError(f"Unknown timeseries '{key_name}'")
-        local_fname = self.local_fname(resource.descriptor["filename"])
+        if not cache:
+            return self._read_resource(timeseries_name, shape="long", aggregate=aggregate)
+
+        local_fname = self.fetch_resource(timeseries_name, shape="long", aggregate=aggregate)
+        return pd.read_csv(local_fname)
+
+    def fetch_resource(self, timeseries_name: str, shape: str = "wide", aggregate: str | None = None) -> str:
+        """
+        Fetch the file containing a resource into the local bookshelf
+
+        If the file is not available in the local cache, it is downloaded from the
+        remote BookShelf. This allows the file to be read in chunks
+        rather than loading the entire resource into memory.
+
+        Parameters
+        ----------
+        timeseries_name : str
+            Name of the resource
+        shape : str
+            Shape of the resource ("wide" or "long")
+        aggregate : str
+            If provided, fetch an aggregation of the resource that was precomputed
+            when the resource was added (see [add_timeseries][bookshelf.LocalBook.add_timeseries])
+
+        Raises
+        ------
+        ValueError
+            The book doesn't contain the resource
+
+        Returns
+        -------
+        :
+            Path of the local file
+        """
+        resource = self._get_resource(timeseries_name, shape, aggregate)
+        fname = resource.descriptor["filename"]
+        local_fname = self.local_fname(fname)
         fetch_file(
-            self.url(resource.descriptor.get("filename")),
+            self.urls(fname),
             pathlib.Path(local_fname),
             known_hash=resource.descriptor.get("hash"),
+            shared_fnames=[
+                shared / self.relative_path(self.name, self.version, self.edition, fname)
+                for shared in self.shared_bookshelves
+            ],
         )
-        return pd.read_csv(local_fname)
+        mark_accessed(local_fname)
+        return local_fname
+
+    def _check_new_resource(
+        self, timeseries_name: str, shape: str, file_format: str, aggregate: str | None
+    ) -> tuple[str, str]:
+        name = get_resource_key(timeseries_name=timeseries_name, shape=shape, aggregate=aggregate)
+        fname = get_resource_filename(
+            book_name=self.name,
+            long_version=self.long_version(),
+            timeseries_name=timeseries_name,
+            shape=shape,
+            file_format=file_format,
+            aggregate=aggregate,
+        )
+        # Resources and aggregations share a namespace,
+        # e.g. "by_country" aggregated to "world" and "by_country_world"
+        for resource in self.metadata().get("resources", []):
+            if resource["name"] == name or resource["filename"] == fname:
+                raise ValueError(f"Book already contains a resource named '{name}'")
+        return name, fname
+
+    def _get_resource(
+        self, timeseries_name: str, shape: str, aggregate: str | None = None
+    ) -> datapackage.Resource:
+        key_name = get_resource_key(timeseries_name=timeseries_name, shape=shape, aggregate=aggregate)
+        resource: datapackage.Resource = self.as_datapackage().get_resource(key_name)
+        if resource is None:
+            raise ValueError(f"Unknown timeseries '{key_name}'")
+        return resource
+
+    def _read_resource(self, timeseries_name: str, shape: str, aggregate: str | None = None) -> pd.DataFrame:
+        resource = self._get_resource(timeseries_name, shape, aggregate)
+        fname = resource.descriptor["filename"]
+        if os.path.exists(self.local_fname(fname)):
+            return pd.read_csv(self.fetch_resource(timeseries_name, shape, aggregate))
+
+        with stream_file(self.urls(fname), known_hash=resource.descriptor.get("hash")) as file_handle:
+            data = pd.read_csv(file_handle, compression="gzip" if fname.endswith(".gz") else None)
+        return data
+
+
+def open_books() -> list[LocalBook]:
+    """
+    Get the books that are currently open in this process
 
+    A book is open while an instance of [LocalBook][bookshelf.LocalBook] referencing it
+    is alive.
 
-def get_resource_key(*, timeseries_name: str, shape: str) -> str:
+    Returns
+    -------
+    :
+        List of the live [LocalBook][bookshelf.LocalBook] instances
+    """
+    return list(_OPEN_BOOKS)
+
+
+def get_resource_key(*, timeseries_name: str, shape: str, aggregate: str | None = None) -> str:
     """
     Construct a resource key name by concatenating all given arguments with underscores.
 
@@ -540,19 +751,27 @@ def get_resource_key(*, timeseries_name: str, shape: str) -> str:
         The name of the timeseries the resource represents.
     shape : str
         The shape of the data (e.g., 'wide', 'long') the resource contains.
+    aggregate : str
+        The name of the aggregation the resource contains, if any.
 
     Returns
     -------
     :
         The concatenated key name formed from all the input arguments.
     """
-    key_name_tuple = (timeseries_name, shape)
+    key_name_tuple = (timeseries_name, shape) if aggregate is None else (timeseries_name, aggregate, shape)
     key_name = "_".join(key_name_tuple)
     return key_name
 
 
-def get_resource_filename(
-    *, book_name: str, long_version: str, timeseries_name: str, shape: str, file_format: str
+def get_resource_filename(  # noqa: PLR0913
+    *,
+    book_name: str,
+    long_version: str,
+    timeseries_name: str,
+    shape: str,
+    file_format: str,
+    aggregate: str | None = None,
 ) -> str:
     """
     Generate a resource filename using specified attributes and file format.
@@ -572,13 +791,149 @@ def get_resource_filename(
         The shape of the data (e.g., 'wide', 'long') the resource contains.
     file_format : str
         The file format extension (without the period) for the resource file (e.g., 'csv', 'csv.gz').
+    aggregate : str
+        The name of the aggregation the resource contains, if any.
 
     Returns
     -------
     :
         The constructed filename in the format
-        `{book_name}_{long_version}_{timeseries_name}_{shape}.{file_format}`.
+        `{book_name}_{long_version}_{timeseries_name}_{shape}.{file_format}`
+        or `{book_name}_{long_version}_{timeseries_name}_{aggregate}_{shape}.{file_format}`
+        for an aggregation.
     """
-    filename_tuple = (book_name, long_version, timeseries_name, shape)
+    filename_tuple: tuple[str, ...] = (book_name, long_version, timeseries_name, shape)
+    if aggregate is not None:
+        filename_tuple = (book_name, long_version, timeseries_name, aggregate, shape)
     filename = "_".join(filename_tuple)
     return f"{filename}.{file_format}"
+
+
+def aggregate_timeseries(data: scmdata.ScmRun, aggregation: Aggregation) -> scmdata.ScmRun:
+    """
+    Aggregate timeseries by mapping metadata values onto groups
+
+    For each dimension in `aggregation`, the metadata values of the timeseries are replaced
+    and any timeseries which then share the same metadata are summed.
+    Timeseries with different units are never summed together.
+
+    Parameters
+    ----------
+    data
+        Timeseries to aggregate
+    aggregation
+        Mapping of dimension to the new values of that dimension
+
+        The new values are either a mapping from the existing values to the new values
+        (e.g. `{"region": {"AUS": "R5OECD90+EU", "CHN": "R5ASIA"}}`)
+        or a single value which all existing values are mapped onto
+        (e.g. `{"region": "World"}`).
+        Timeseries with values missing from a mapping are excluded from the aggregation.
+
+    Raises
+    ------
+    ValueError
+        A dimension of `aggregation` is not in the metadata of `data`
+
+    Returns
+    -------
+    :
+        Aggregated timeseries
+    """
+    timeseries = data.timeseries().reset_index()
+    meta_columns = list(data.meta.columns)
+
+    for dimension, mapping in aggregation.items():
+        if dimension not in meta_columns:
+            raise ValueError(f"Unknown dimension '{dimension}'")
+        if isinstance(mapping, str):
+            timeseries[dimension] = mapping
+        else:
+            timeseries[dimension] = timeseries[dimension].map(mapping)
+            timeseries = timeseries[timeseries[dimension].notna()]
+
+    aggregated = timeseries.groupby(meta_columns, dropna=False).sum(min_count=1)
+    return scmdata.ScmRun(aggregated)
+
+
+def get_resource_statistics(
+    data: scmdata.ScmRun, fname: str, row_count: int, uncompressed_bytes: int
+) -> ResourceStatistics:
+    """
+    Calculate the statistics of a resource
+
+    Parameters
+    ----------
+    data
+        Timeseries contained in the resource
+    fname
+        Path of the resource file
+    row_count
+        Number of rows written to the resource file
+    uncompressed_bytes
+        Size, in bytes, of the resource file once decompressed
+
+    Returns
+    -------
+    :
+        Statistics of the resource
+    """
+    # Values are listed in the order they first appear in the resource,
+    # which is sorted in the same way as the written timeseries
+    meta = pd.MultiIndex.from_frame(data.meta).sort_values().to_frame(index=False)
+    dimensions = {}
+    for column in meta.columns:
+        codes, uniques = pd.factorize(meta[column], use_na_sentinel=False)
+        counts = np.bincount(codes, minlength=len(uniques))
+        dimensions[column] = DimensionStatistics(
+            values=[_to_python(value) for value in uniques], counts=[int(count) for count in counts]
+        )
+
+    years = data.time_points.years() if len(data) else []
+    return ResourceStatistics(
+        row_count=row_count,
+        timeseries_count=len(data),
+        year_min=int(min(years)) if len(years) else None,
+        year_max=int(max(years)) if len(years) else None,
+        bytes=os.path.getsize(fname),
+        uncompressed_bytes=uncompressed_bytes,
+        dimensions=dimensions,
+    )
+
+
+def _to_python(value: Any) -> Any:
+    # Convert numpy scalars so they can be serialised and missing values to None
+    value = value.item() if hasattr(value, "item") else value
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+class _CountingWriter(io.RawIOBase):
+    # Counts the bytes written before they are compressed
+    def __init__(self, raw: Any):
+        self._raw = raw
+        self.size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b: Any) -> int:
+        size = memoryview(b).nbytes
+        self._raw.write(b)
+        self.size += size
+        return size
+
+
+def _write_csv(data: pd.DataFrame, fname: str, compression: str | None, **kwargs: Any) -> int:
+    # Returns the uncompressed size of the written file.
+    # The gzip trailer only contains the size modulo 2**32 so the size is counted while writing
+    if compression == "infer":
+        compression = "gzip" if fname.endswith(".gz") else None
+    if compression not in ("gzip", None):
+        raise ValueError(f"Unsupported compression: {compression}")
+    opener = gzip.open if compression == "gzip" else open
+    with opener(fname, "wb") as file_handle:
+        writer = _CountingWriter(file_handle)
+        data.to_csv(writer, **kwargs)  # type: ignore
+    return writer.size
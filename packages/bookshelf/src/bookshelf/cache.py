@@ -0,0 +1,411 @@
+"""
+Management of the local bookshelf cache
+
+Books fetched from a remote bookshelf are cached locally and are never removed
+by [BookShelf][bookshelf.BookShelf].
+[CacheManager][bookshelf.cache.CacheManager] tracks the size and last access of each
+cached book so that the cache can be kept below a size quota by evicting the
+least recently used books.
+
+The cache can also be managed from the command line using `python -m bookshelf.cache`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import datetime
+import json
+import logging
+import os
+import pathlib
+import shutil
+import sys
+from collections.abc import Iterator
+
+import attrs
+import pooch
+
+from bookshelf.book import DATAPACKAGE_FILENAME, open_books
+from bookshelf.utils import create_local_cache, get_env_var, get_lock_fname, try_file_lock
+
+logger = logging.getLogger(__name__)
+
+
+@attrs.define(frozen=True)
+class CachedFile:
+    """
+    A file in the local bookshelf
+    """
+
+    path: pathlib.Path
+    size: int
+    """Size of the file in bytes"""
+    last_access: float
+    """Time of the last access as a unix timestamp"""
+
+
+@attrs.define(frozen=True)
+class CachedBook:
+    """
+    A single edition of a book stored in the local bookshelf
+    """
+
+    name: str
+    long_version: str
+    path: pathlib.Path
+    files: tuple[CachedFile, ...]
+
+    @property
+    def size(self) -> int:
+        """
+        Total size of the book's files in bytes
+        """
+        return sum(f.size for f in self.files)
+
+    @property
+    def last_access(self) -> float:
+        """
+        Time that any of the book's files were last accessed
+        """
+        return max((f.last_access for f in self.files), default=0.0)
+
+
+@attrs.define(frozen=True)
+class CacheStats:
+    """
+    Summary of the contents of the local bookshelf
+    """
+
+    path: pathlib.Path
+    size: int
+    """Total size of the cache in bytes"""
+    max_size: int | None
+    """Size quota of the cache in bytes, if configured"""
+    books: tuple[CachedBook, ...]
+    """Cached books ordered from least to most recently used"""
+
+
+def get_cache_max_size() -> int | None:
+    """
+    Get the size quota for the local bookshelf
+
+    The quota is read from the
+    [BOOKSHELF_CACHE_MAX_SIZE](/configuration/#bookshelf_cache_max_size) environment variable.
+
+    Returns
+    -------
+    :
+        Maximum size of the cache in bytes or None if no quota is configured
+    """
+    value = get_env_var("CACHE_MAX_SIZE", raise_on_missing=False)
+    if not value:
+        return None
+    return int(value)
+
+
+@contextlib.contextmanager
+def _preserve_access_time(fname: pathlib.Path) -> Iterator[None]:
+    try:
+        stat = fname.stat()
+    except FileNotFoundError:
+        yield
+        return
+    try:
+        yield
+    finally:
+        if fname.exists():
+            os.utime(fname, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+def _hash_matches(fname: pathlib.Path, known_hash: str | None) -> bool:
+    with _preserve_access_time(fname):
+        return bool(pooch.hashes.hash_matches(fname, known_hash))
+
+
+def _is_lock_file(fname: pathlib.Path) -> bool:
+    return fname.name.startswith(".") and fname.name.endswith(".lock")
+
+
+@contextlib.contextmanager
+def _lock_book(book: CachedBook) -> Iterator[bool]:
+    # Hold the locks used while fetching each of the book's files
+    with contextlib.ExitStack() as stack:
+        for lock_fname in sorted(book.path.glob(".*.lock")):
+            if not stack.enter_context(try_file_lock(lock_fname)):
+                yield False
+                return
+        yield True
+
+
+class CacheManager:
+    """
+    Tracks and prunes the books stored in a local bookshelf
+
+    The last access of a book is determined from the access times of its files,
+    which are updated whenever a [LocalBook][bookshelf.LocalBook] reads its metadata or
+    one of its resources.
+
+    Books that are currently open (i.e. an instance of [LocalBook][bookshelf.LocalBook]
+    referencing the book is alive in this process) are never evicted.
+    Other processes are detected using the lock files held while fetching files
+    (see [fetch_file][bookshelf.utils.fetch_file]),
+    so books with a file that is being fetched by any process on the same host are not evicted either.
+    A book which is open in another process but isn't being fetched can be evicted;
+    its files are then fetched again when they are next used.
+    """
+
+    def __init__(self, path: str | pathlib.Path | None = None, max_size: int | None = None):
+        if path is None:
+            path = create_local_cache(path)
+        self.path = pathlib.Path(path)
+        self.max_size = max_size if max_size is not None else get_cache_max_size()
+
+    def books(self) -> list[CachedBook]:
+        """
+        Get the books stored in the local bookshelf
+
+        Returns
+        -------
+        :
+            Cached books ordered from least to most recently used
+        """
+        books: list[CachedBook] = []
+        if not self.path.exists():
+            return books
+
+        for volume_dir in self.path.iterdir():
+            if not volume_dir.is_dir():
+                continue
+            for edition_dir in volume_dir.iterdir():
+                if not edition_dir.is_dir():
+                    continue
+                files: list[CachedFile] = []
+                for fname in edition_dir.iterdir():
+                    if fname.name.startswith(".") or not fname.is_file():
+                        continue
+                    stat = fname.stat()
+                    files.append(CachedFile(path=fname, size=stat.st_size, last_access=stat.st_atime))
+                books.append(
+                    CachedBook(
+                        name=volume_dir.name,
+                        long_version=edition_dir.name,
+                        path=edition_dir,
+                        files=tuple(sorted(files, key=lambda f: f.path.name)),
+                    )
+                )
+        return sorted(books, key=lambda b: b.last_access)
+
+    def size(self) -> int:
+        """
+        Get the total size of the local bookshelf
+
+        Includes any volume metadata in addition to the files of each book.
+
+        Returns
+        -------
+        :
+            Size in bytes
+        """
+        total = 0
+        for root, _, fnames in os.walk(self.path):
+            for fname in fnames:
+                total += os.path.getsize(os.path.join(root, fname))
+        return total
+
+    def stats(self) -> CacheStats:
+        """
+        Summarise the contents of the local bookshelf
+
+        Returns
+        -------
+        :
+            Size and books stored in the cache
+        """
+        return CacheStats(
+            path=self.path,
+            size=self.size(),
+            max_size=self.max_size,
+            books=tuple(self.books()),
+        )
+
+    def is_open(self, book: CachedBook) -> bool:
+        """
+        Check if a cached book is currently open
+
+        Parameters
+        ----------
+        book
+            Cached book to check
+
+        Returns
+        -------
+        :
+            True if an instance of [LocalBook][bookshelf.LocalBook] referencing the book
+            is alive in this process
+
+            Books which are open in other processes are not detected.
+        """
+        path = book.path.resolve()
+        for local_book in open_books():
+            local_path = pathlib.Path(local_book.local_bookshelf, local_book.name, local_book.long_version())
+            if local_path.resolve() == path:
+                return True
+        return False
+
+    def prune(self, max_size: int | None = None) -> list[CachedBook]:
+        """
+        Evict the least recently used books until the cache is below a size quota
+
+        Parameters
+        ----------
+        max_size
+            Size quota in bytes
+
+            If not provided, the quota of the manager is used
+
+        Raises
+        ------
+        ValueError
+            No quota has been configured
+
+        Returns
+        -------
+        :
+            The books which were removed from the cache
+        """
+        if max_size is None:
+            max_size = self.max_size
+        if max_size is None:
+            raise ValueError("No cache quota configured")
+
+        size = self.size()
+        removed: list[CachedBook] = []
+        for book in self.books():
+            if size <= max_size:
+                break
+            if self.is_open(book):
+                logger.debug(f"Not evicting {book.name}@{book.long_version} as it is open")
+                continue
+            if not self._remove_book(book):
+                logger.debug(f"Not evicting {book.name}@{book.long_version} as it is being fetched")
+                continue
+            logger.info(f"Evicted {book.name}@{book.long_version} ({book.size} bytes)")
+            size -= book.size
+            removed.append(book)
+
+        if size > max_size:
+            logger.warning(f"Cache size ({size} bytes) is still above the quota ({max_size} bytes)")
+        return removed
+
+    def verify(self, remove: bool = False) -> list[pathlib.Path]:
+        """
+        Verify the hashes of the cached resources
+
+        Each cached resource is checked against the hash in its book's `datapackage.json`.
+        Reading the files during verification does not count as an access.
+
+        Parameters
+        ----------
+        remove
+            If True, remove any files which fail verification
+            unless the book is open or the file is being fetched.
+
+            The affected resources are fetched again from the remote bookshelf when
+            they are next used. A book with an unreadable `datapackage.json` is
+            removed entirely.
+
+        Returns
+        -------
+        :
+            Files which failed verification
+        """
+        invalid: list[pathlib.Path] = []
+        for book in self.books():
+            metadata_fname = book.path / DATAPACKAGE_FILENAME
+            try:
+                with _preserve_access_time(metadata_fname), open(metadata_fname) as file_handle:
+                    resources = json.load(file_handle).get("resources", [])
+            except (OSError, ValueError):
+                logger.warning(f"Could not read metadata for {book.name}@{book.long_version}")
+                invalid.append(metadata_fname)
+                if remove and not self.is_open(book):
+                    self._remove_book(book)
+                continue
+
+            for resource in resources:
+                fname = book.path / resource["filename"]
+                if not fname.exists():
+                    continue
+                if not _hash_matches(fname, resource.get("hash")):
+                    logger.warning(f"Hash for {fname} does not match the expected value")
+                    invalid.append(fname)
+                    if remove and not self.is_open(book):
+                        with try_file_lock(get_lock_fname(fname)) as locked:
+                            if locked:
+                                fname.unlink()
+        return invalid
+
+    def _remove_book(self, book: CachedBook) -> bool:
+        with _lock_book(book) as locked:
+            if not locked:
+                return False
+            for fname in book.path.iterdir():
+                if fname.is_dir():
+                    shutil.rmtree(fname)
+                elif not _is_lock_file(fname):
+                    fname.unlink()
+        # The lock files can only be removed on all platforms once they are released
+        shutil.rmtree(book.path, ignore_errors=True)
+        return True
+
+
+def _format_book(book: CachedBook) -> str:
+    last_access = datetime.datetime.fromtimestamp(book.last_access).isoformat(sep=" ", timespec="seconds")
+    return f"{book.name}@{book.long_version}\t{book.size} bytes\tlast used {last_access}"
+
+
+def main() -> None:
+    """
+    Manage the local bookshelf from the command line
+    """
+    parser = argparse.ArgumentParser(description="Manage the local bookshelf cache")
+    parser.add_argument(
+        "--path", help="Local bookshelf to manage. Defaults to the default local cache location"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("stats", help="Show the size and books in the cache")
+    prune_parser = subparsers.add_parser("prune", help="Evict the least recently used books")
+    prune_parser.add_argument(
+        "--max-size", type=int, help="Size quota in bytes. Defaults to BOOKSHELF_CACHE_MAX_SIZE"
+    )
+    verify_parser = subparsers.add_parser("verify", help="Verify the hashes of the cached resources")
+    verify_parser.add_argument("--remove", action="store_true", help="Remove files which fail verification")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    manager = CacheManager(args.path)
+
+    if args.command == "stats":
+        stats = manager.stats()
+        quota = f" (quota {stats.max_size} bytes)" if stats.max_size is not None else ""
+        print(f"{stats.path}: {stats.size} bytes in {len(stats.books)} books{quota}")
+        for book in stats.books:
+            print(_format_book(book))
+    elif args.command == "prune":
+        try:
+            removed = manager.prune(args.max_size)
+        except ValueError as exc:
+            parser.error(str(exc))
+        for book in removed:
+            print(f"Removed {_format_book(book)}")
+    elif args.command == "verify":
+        invalid = manager.verify(remove=args.remove)
+        for fname in invalid:
+            print(f"{'Removed' if args.remove and not fname.exists() else 'Invalid'} {fname}")
+        if invalid:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,43 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable
+import logging
+from collections.abc import Iterable, Sequence
+from typing import Any
 
 import attrs
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
 from scmdata import ScmRun
 
-from bookshelf.schema import NotebookMetadata
+from bookshelf.book import LocalBook
+from bookshelf.schema import Dimension, NotebookMetadata
+
+logger = logging.getLogger(__name__)
+
+# Distinct values of a dimension, the number of timeseries with each value and the number of missing values
+_ColumnValues = tuple[Any, npt.NDArray[np.integer[Any]], int]
+
+
+@attrs.define(frozen=True)
+class Violation:
+    """
+    Values of a dimension that don't match the data dictionary
+    """
+
+    dimension: str
+    """Name of the dimension"""
+    check: str
+    """
+    Name of the check that failed
+
+    One of the checks of [VerificationInfo][bookshelf.dataset_structure.VerificationInfo]
+    """
+    values: tuple[Any, ...] = ()
+    """Distinct values which failed the check, where None represents a missing value"""
+    row_count: int = 0
+    """Number of timeseries which failed the check"""
 
 
 @attrs.define
@@ -20,6 +51,20 @@ class VerificationInfo:
     col_type_match: bool = attrs.field(init=False, default=True)
     controlled_vocabulary_match: bool = attrs.field(init=False, default=True)
     non_na_col_match: bool = attrs.field(init=False, default=True)
+    violations: list[Violation] = attrs.field(init=False, factory=list)
+    """Details about each of the failed checks"""
+
+    def add_violation(self, violation: Violation) -> None:
+        """
+        Record a failed check
+
+        Parameters
+        ----------
+        violation
+            Details of the failed check
+        """
+        setattr(self, violation.check, False)
+        self.violations.append(violation)
 
     def error_message(self) -> str | None:
         """
@@ -33,8 +78,16 @@ class VerificationInfo:
         """
         validation = attrs.asdict(self, recurse=False)
         for attr, value in validation.items():
-            if not value:
-                return f"Data dictionary does not match the data: {attr} is not true"
+            if attr != "violations" and not value:
+                message = f"Data dictionary does not match the data: {attr} is not true"
+                details = [
+                    f"{v.dimension}: {list(v.values)} ({v.row_count} timeseries)"
+                    for v in self.violations
+                    if v.check == attr and v.values
+                ]
+                if details:
+                    message += " (" + "; ".join(details) + ")"
+                return message
 
         return None
 
@@ -85,14 +138,57 @@ def print_dataset_structure(data: ScmRun) -> None:
         directly to the console.
     """
     data_dict = get_dataset_dictionary(data)
+    _print_structure(list(data_dict.keys()), list(data_dict.values()))
 
+
+def print_book_structure(book: LocalBook, timeseries_name: str, aggregate: str | None = None) -> None:
+    """
+    Print the structure of a resource in a book.
+
+    The output is the same as [print_dataset_structure][bookshelf.dataset_structure.print_dataset_structure]
+    with the number of unique values (cardinality) of each dimension shown in the header.
+
+    The unique values are read from the statistics stored in the Book's metadata
+    so the resource doesn't need to be fetched or loaded.
+    For Books written without statistics, the resource is loaded instead.
+
+    Parameters
+    ----------
+    book
+        Book containing the resource
+    timeseries_name
+        Name of the resource
+    aggregate
+        If provided, print the structure of a precomputed aggregation of the resource
+
+    Raises
+    ------
+    ValueError
+        The book doesn't contain the resource
+    """
+    statistics = book.resource_statistics(timeseries_name, aggregate=aggregate)
+    data_dict: dict[str, Iterable[Any]]
+    if statistics is None:
+        logger.info(f"No statistics for {timeseries_name!r}. Loading the data")
+        data_dict = get_dataset_dictionary(book.timeseries(timeseries_name, aggregate=aggregate))
+    else:
+        data_dict = {
+            name: [np.nan if value is None else value for value in dimension.values]
+            for name, dimension in sorted(statistics.dimensions.items())
+        }
+
+    keys = list(data_dict.keys())
+    values = [list(v) for v in data_dict.values()]
+    _print_structure([f"{key} ({len(v)})" for key, v in zip(keys, values)], values)
+
+
+def _print_structure(k_lst: Sequence[str], values: Sequence[Iterable[Any]]) -> None:
     # Convert values to strings once
-    k_lst = list(data_dict.keys())
-    v_lst = [list(map(str, values)) for values in data_dict.values()]
-    max_length = max(len(values) for values in v_lst)
+    v_lst = [list(map(str, v)) for v in values]
+    max_length = max(len(v) for v in v_lst)
 
     # Calculate width for each column
-    width_lst = [max(len(str(item)) for item in [key, *values]) + 5 for key, values in zip(k_lst, v_lst)]
+    width_lst = [max(len(str(item)) for item in [key, *v]) + 5 for key, v in zip(k_lst, v_lst)]
 
     # Print header
     print("".join(f"{item:{width}}" for item, width in zip(k_lst, width_lst)))
@@ -106,7 +202,7 @@ def print_dataset_structure(data: ScmRun) -> None:
 
     # Print each row of values
     for i in range(max_length):
-        row_values = [values[i] if i < len(values) else "" for values in v_lst]
+        row_values = [v[i] if i < len(v) else "" for v in v_lst]
         print("".join(f"{item:{width}}" for item, width in zip(row_values, width_lst)))
 
 
@@ -120,6 +216,9 @@ def verify_data_dictionary(data: ScmRun, notebook_config: NotebookMetadata) -> V
     It performs these checks by comparing the actual data with the requirements
     specified in the data dictionary of the notebook configuration.
 
+    Each column is factorised once so the checks only consider the distinct values
+    of the column rather than every timeseries.
+
     Parameters
     ----------
     data: ScmRun
@@ -132,6 +231,8 @@ def verify_data_dictionary(data: ScmRun, notebook_config: NotebookMetadata) -> V
     -------
     :
         An instance of VerificationInfo that contains the results of the data verification.
+        Any failed checks are detailed in
+        [VerificationInfo.violations][bookshelf.dataset_structure.VerificationInfo.violations].
 
         If the data dictionary is empty, the function returns None,
         indicating that no verification is necessary.
@@ -140,41 +241,175 @@ def verify_data_dictionary(data: ScmRun, notebook_config: NotebookMetadata) -> V
     if len(notebook_config.data_dictionary) == 0:
         return None
 
-    verification_info = VerificationInfo()
+    meta = data.meta
+    dimensions = {
+        variable.name: _count_values(meta[variable.name])
+        for variable in notebook_config.data_dictionary
+        if variable.name in meta.columns
+    }
+    return _verify_dimensions(dimensions, notebook_config)
+
+
+def verify_book(
+    book: LocalBook,
+    timeseries_name: str,
+    notebook_config: NotebookMetadata,
+    chunksize: int = 100_000,
+    aggregate: str | None = None,
+) -> VerificationInfo | None:
+    """
+    Verify a resource of a book against the data dictionary without loading it into memory
+
+    The wide format resource is read in chunks of `chunksize` timeseries
+    and the distinct values of each dimension are accumulated,
+    so only the distinct values need to fit in memory.
+    The same checks as [verify_data_dictionary][bookshelf.dataset_structure.verify_data_dictionary]
+    are performed.
 
-    # Retrieve unique metadata values from the data for comparison with the data dictionary.
-    unique_values = get_dataset_dictionary(data)
+    Metadata values are read as strings,
+    so any values are considered to match a numeric type if they can be converted to that type.
+
+    Parameters
+    ----------
+    book
+        Book containing the resource
+
+        The resource is fetched from the remote bookshelf if needed
+    timeseries_name
+        Name of the resource
+    notebook_config
+        Configuration of the notebook, including the data dictionary which contains specifications
+        for data validation.
+    chunksize
+        Number of timeseries to read at once
+    aggregate
+        If provided, verify a precomputed aggregation of the resource
+
+    Raises
+    ------
+    ValueError
+        The book doesn't contain the resource
+
+    Returns
+    -------
+    :
+        An instance of VerificationInfo that contains the results of the data verification.
+
+        If the data dictionary is empty, the function returns None,
+        indicating that no verification is necessary.
+    """
+    if len(notebook_config.data_dictionary) == 0:
+        return None
+
+    local_fname = book.fetch_resource(timeseries_name, shape="wide", aggregate=aggregate)
+    header = pd.read_csv(local_fname, nrows=0).columns
+    meta_columns = [column for column in header if not _is_time_column(column)]
+    columns = [variable.name for variable in notebook_config.data_dictionary if variable.name in meta_columns]
+
+    value_counts: dict[str, pd.Series[int]] = {column: pd.Series(dtype=int) for column in columns}
+    na_counts = dict.fromkeys(columns, 0)
+    for chunk in pd.read_csv(local_fname, usecols=columns, dtype=str, chunksize=chunksize):
+        for column in columns:
+            value_counts[column] = value_counts[column].add(chunk[column].value_counts(), fill_value=0)
+            na_counts[column] += int(chunk[column].isna().sum())
+
+    dimensions = {
+        column: (
+            value_counts[column].index.to_numpy(),
+            value_counts[column].to_numpy(dtype=int),
+            na_counts[column],
+        )
+        for column in columns
+    }
+    return _verify_dimensions(dimensions, notebook_config)
+
+
+def _is_time_column(name: str) -> bool:
+    # Timeseries in the wide format have a column for each time e.g. "2020-01-01 00:00:00"
+    try:
+        pd.Timestamp(name)
+    except ValueError:
+        return False
+    return True
+
+
+def _count_values(column: pd.Series[Any]) -> _ColumnValues:
+    codes, uniques = pd.factorize(column, use_na_sentinel=True)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    na_count = int((codes < 0).sum())
+    return uniques, counts, na_count
+
+
+def _verify_dimensions(
+    dimensions: dict[str, _ColumnValues], notebook_config: NotebookMetadata
+) -> VerificationInfo:
+    verification_info = VerificationInfo()
 
-    # Iterate through each entry (dimension) in the data dictionary.
     for variable in notebook_config.data_dictionary:
-        # Check if the required dimension in the data dictionary not in the data.
-        if variable.name not in data.meta.columns:
-            if variable.required_column is True:
-                verification_info.column_match = False
-            else:
-                continue
-        else:
-            # Validate that the data type of the column in the data matches its specified type
-            # in the data dictionary.
-            try:
-                data.meta[variable.name].astype(variable.type)  # type: ignore
-            except ValueError:
-                verification_info.col_type_match = False
-
-            # If a controlled vocabulary (CV) is defined, check if all data values are included in the CV.
-            if variable.controlled_vocabulary is not None:
-                if not set(unique_values[variable.name]).issubset(
-                    set(
-                        [
-                            controlled_vocabulary.value
-                            for controlled_vocabulary in variable.controlled_vocabulary
-                        ]
-                    )
-                ):
-                    verification_info.controlled_vocabulary_match = False
-
-            # For not allowed missing value(NA) dimensions, verify there are NA values in the data.
-            if variable.allowed_NA is False:
-                if data.meta[variable.name].isna().any():
-                    verification_info.non_na_col_match = False
+        if variable.name not in dimensions:
+            if variable.required_column:
+                verification_info.add_violation(Violation(dimension=variable.name, check="column_match"))
+            continue
+
+        for violation in _verify_values(variable, *dimensions[variable.name]):
+            verification_info.add_violation(violation)
     return verification_info
+
+
+def _verify_values(
+    variable: Dimension, uniques: Any, counts: npt.NDArray[np.integer[Any]], na_count: int
+) -> list[Violation]:
+    violations = []
+
+    # Only the distinct values need to be converted to check the type.
+    # Values are checked individually to find the offending values only if the conversion fails
+    bad_type = []
+    if not _matches_type(uniques, variable.type):
+        bad_type = [i for i, value in enumerate(uniques) if not _matches_type([value], variable.type)]
+    bad_values = [uniques[i] for i in bad_type]
+    row_count = int(counts[bad_type].sum())
+    if na_count and not _matches_type([np.nan], variable.type):
+        bad_values.append(None)
+        row_count += na_count
+    if bad_values:
+        violations.append(
+            Violation(
+                dimension=variable.name,
+                check="col_type_match",
+                values=tuple(bad_values),
+                row_count=row_count,
+            )
+        )
+
+    if variable.controlled_vocabulary is not None:
+        vocabulary = [cv.value for cv in variable.controlled_vocabulary]
+        outside = ~pd.Index(uniques).isin(vocabulary)
+        outside_values = list(pd.Index(uniques)[outside])
+        row_count = int(counts[outside].sum())
+        # Missing values are never part of the controlled vocabulary, even if NA values are allowed
+        if na_count:
+            outside_values.append(None)
+            row_count += na_count
+        if outside_values:
+            violations.append(
+                Violation(
+                    dimension=variable.name,
+                    check="controlled_vocabulary_match",
+                    values=tuple(outside_values),
+                    row_count=row_count,
+                )
+            )
+
+    if not variable.allowed_NA and na_count:
+        violations.append(
+            Violation(dimension=variable.name, check="non_na_col_match", values=(None,), row_count=na_count)
+        )
+    return violations
+
+
+def _matches_type(values: Any, dtype: str) -> bool:
+    try:
+        pd.Series(values, dtype=object).astype(dtype)  # type: ignore
+    except ValueError:
+        return False
+    return True
@@ -0,0 +1,235 @@
+"""
+SQL queries across the resources of one or more books
+
+Resources are copied in chunks into an embedded SQLite database on disk
+so that filters, joins and aggregates across books are evaluated by the database
+and only the results of a query are loaded into memory.
+
+```python
+from bookshelf import BookShelf
+from bookshelf.query import QueryEngine
+
+shelf = BookShelf()
+with QueryEngine() as engine:
+    gdp = engine.add_resource(shelf.load("wdi"), "by_country")
+    population = engine.add_resource(shelf.load("un-wpp"), "by_country")
+    engine.sql(
+        f"SELECT g.region, g.year, g.value / p.value AS gdp_per_capita "
+        f'FROM "{gdp}" g JOIN "{population}" p USING (region, year) '
+        f"WHERE g.year >= 2000"
+    )
+```
+"""
+
+from __future__ import annotations
+
+import logging
+import pathlib
+import re
+import sqlite3
+import tempfile
+from collections.abc import Iterator, Sequence
+from types import TracebackType
+from typing import Any
+
+import pandas as pd
+
+from bookshelf.book import LocalBook
+
+logger = logging.getLogger(__name__)
+
+INGEST_CHUNK_SIZE = 100_000
+"""Number of rows of a resource that are read into memory at once while loading"""
+
+
+def get_table_name(book_name: str, timeseries_name: str) -> str:
+    """
+    Get the default table name for a resource
+
+    Parameters
+    ----------
+    book_name
+        Name of the book
+    timeseries_name
+        Name of the resource
+
+    Returns
+    -------
+    :
+        Table name of the form `{book_name}_{timeseries_name}`
+        with any characters other than letters, digits and underscores replaced by underscores
+    """
+    return re.sub(r"\W", "_", f"{book_name}_{timeseries_name}")
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+class QueryEngine:
+    """
+    Query the long format resources of books using SQL
+
+    Each resource is stored as a table with a column for each metadata dimension
+    as well as `year` (an integer) and `value` columns.
+
+    Loading a resource fetches it into the local bookshelf if needed and then copies it
+    into the database in chunks of [INGEST_CHUNK_SIZE][bookshelf.query.INGEST_CHUNK_SIZE] rows.
+    The database requires roughly as much disk space as the uncompressed resources.
+    Resources larger than the available memory can be queried
+    unless an in-memory database (`":memory:"`) is used.
+    """
+
+    def __init__(self, database: str | pathlib.Path | None = None):
+        """
+        Create a query engine
+
+        Parameters
+        ----------
+        database
+            Location of the SQLite database
+
+            Defaults to a temporary file which is removed when the engine is closed.
+            A file can be used to keep the loaded tables between sessions.
+        """
+        self._temporary_directory: tempfile.TemporaryDirectory[str] | None = None
+        if database is None:
+            self._temporary_directory = tempfile.TemporaryDirectory(prefix="bookshelf-query-")
+            database = pathlib.Path(self._temporary_directory.name) / "query.sqlite"
+        self.database = database
+        self._connection = sqlite3.connect(database)
+
+    def __enter__(self) -> QueryEngine:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the connection to the database
+
+        A temporary database is removed.
+        """
+        self._connection.close()
+        if self._temporary_directory is not None:
+            self._temporary_directory.cleanup()
+            self._temporary_directory = None
+
+    def add_resource(
+        self,
+        book: LocalBook,
+        timeseries_name: str,
+        table_name: str | None = None,
+    ) -> str:
+        """
+        Load a resource of a book as a table
+
+        Any existing table with the same name is replaced.
+
+        Parameters
+        ----------
+        book
+            Book containing the resource
+        timeseries_name
+            Name of the resource
+
+            The long format of the resource is used
+        table_name
+            Name of the table
+
+            Defaults to [get_table_name][bookshelf.query.get_table_name]
+
+        Raises
+        ------
+        ValueError
+            The book doesn't contain a long format resource for `timeseries_name`
+
+        Returns
+        -------
+        :
+            Name of the table
+        """
+        if table_name is None:
+            table_name = get_table_name(book.name, timeseries_name)
+        local_fname = book.fetch_resource(timeseries_name, shape="long")
+
+        logger.info(f"Loading {book.name}@{book.long_version()} {timeseries_name!r} into {table_name!r}")
+        self._connection.execute(f"DROP TABLE IF EXISTS {_quote(table_name)}")
+        for chunk in pd.read_csv(local_fname, chunksize=INGEST_CHUNK_SIZE):
+            _normalise_chunk(chunk).to_sql(table_name, self._connection, if_exists="append", index=False)
+        self._connection.commit()
+        return table_name
+
+    def add_book(self, book: LocalBook) -> list[str]:
+        """
+        Load all the long format resources of a book as tables
+
+        The tables are named using [get_table_name][bookshelf.query.get_table_name].
+
+        Parameters
+        ----------
+        book
+            Book to load
+
+        Returns
+        -------
+        :
+            Names of the tables
+        """
+        return [
+            self.add_resource(book, resource["timeseries_name"])
+            for resource in book.metadata().get("resources", [])
+            if resource.get("shape") == "long"
+        ]
+
+    def tables(self) -> list[str]:
+        """
+        Get the names of the loaded tables
+
+        Returns
+        -------
+        :
+            Table names in alphabetical order
+        """
+        cursor = self._connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name")
+        return [row[0] for row in cursor.fetchall()]
+
+    def sql(
+        self,
+        query: str,
+        params: Sequence[Any] | dict[str, Any] | None = None,
+        chunksize: int | None = None,
+    ) -> pd.DataFrame | Iterator[pd.DataFrame]:
+        """
+        Run a SQL query
+
+        Parameters
+        ----------
+        query
+            SQLite query
+        params
+            Parameters to substitute into placeholders (`?` or `:name`) in the query
+        chunksize
+            If provided, return an iterator of results containing at most `chunksize` rows each
+            rather than loading all the results at once
+
+        Returns
+        -------
+        :
+            Results of the query
+        """
+        return pd.read_sql_query(query, self._connection, params=params, chunksize=chunksize)
+
+
+def _normalise_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    chunk = chunk.rename(columns={"values": "value"})
+    if "year" in chunk.columns and not pd.api.types.is_numeric_dtype(chunk["year"]):
+        # Years are stored as timestamps e.g. "2020-01-01 00:00:00"
+        chunk["year"] = pd.to_datetime(chunk["year"]).dt.year
+    return chunk
@@ -2,18 +2,57 @@
 Schema
 """
 
+import concurrent.futures
 import os
+import pathlib
+import re
+import urllib.parse
 from typing import Any
 
 import pooch
 from pydantic import BaseModel, Field
 
-from bookshelf.utils import get_env_var, get_notebook_directory
+from bookshelf.utils import DOWNLOAD_MAX_WORKERS, fetch_file, get_env_var, get_notebook_directory
 
 Version = str
 Edition = int
 
 
+def version_sort_key(version: Version) -> tuple[tuple[int, int | str], ...]:
+    """
+    Get a key for sorting versions
+
+    Versions are compared by splitting them into numeric and non-numeric parts
+    so that numeric parts are compared as numbers rather than as strings.
+    For example, "v9" < "v10" and "v1.2.0" < "v1.10.0".
+
+    A suffix containing letters marks a pre-release, which is ordered before the release,
+    e.g. "v1.2.0a1" < "v1.2.0rc1" < "v1.2.0" < "v1.2.0.1".
+
+    Parameters
+    ----------
+    version
+        Version to sort
+
+    Returns
+    -------
+    :
+        Key which can be used with [sorted][] or [max][]
+    """
+    key: list[tuple[int, int | str]] = []
+    for part in re.split(r"(\d+)", version):
+        if part.isdigit():
+            key.append((0, int(part)))
+        elif any(char.isalpha() for char in part):
+            key.append((1, part))
+        elif part:
+            # Separators such as "." sort after the end of a version
+            key.append((3, part))
+    # Marks the end of the version, so that pre-releases sort before the release
+    key.append((2, ""))
+    return tuple(key)
+
+
 class BookVersion(BaseModel):
     """
     Version information for a book
@@ -44,11 +83,11 @@ class VolumeMeta(BaseModel):
         :
             String containing the latest version of a given volume
         """
-        ordered_versions = sorted([v.version for v in self.versions if not v.private])
-        if not ordered_versions:
+        public_versions = [v.version for v in self.versions if not v.private]
+        if not public_versions:
             raise ValueError("No published volumes")
 
-        return ordered_versions[-1]
+        return max(public_versions, key=version_sort_key)
 
     def get_version(self, version: Version) -> list[BookVersion]:
         """
@@ -69,6 +108,132 @@ class VolumeMeta(BaseModel):
         return matching_versions
 
 
+class VolumeIndex:
+    """
+    Lookup tables for the books in a volume
+
+    The versions in a [VolumeMeta][bookshelf.schema.VolumeMeta] are indexed once
+    so that finding the latest version or the editions of a version doesn't require
+    scanning and sorting the list of versions each time.
+    """
+
+    def __init__(self, meta: VolumeMeta):
+        self.name = meta.name
+
+        editions: dict[Version, list[BookVersion]] = {}
+        for version_meta in meta.versions:
+            editions.setdefault(version_meta.version, []).append(version_meta)
+        self._editions = {
+            version: tuple(sorted(books, key=lambda v: v.edition)) for version, books in editions.items()
+        }
+        self._public_versions = tuple(v.version for v in meta.versions if not v.private)
+        self._latest_version = (
+            max(self._public_versions, key=version_sort_key) if self._public_versions else None
+        )
+
+    def get_latest_version(self) -> Version:
+        """
+        Get the latest version for a volume
+
+        Returns
+        -------
+        :
+            String containing the latest version of a given volume
+        """
+        if self._latest_version is None:
+            raise ValueError("No published volumes")
+        return self._latest_version
+
+    def get_version(self, version: Version) -> list[BookVersion]:
+        """
+        Get a set of books for a given version
+
+        Returns
+        -------
+        :
+            List of matching books sorted by edition
+        """
+        return list(self._editions.get(version, ()))
+
+    def list_versions(self) -> list[Version]:
+        """
+        Get the versions which aren't private
+
+        Returns
+        -------
+        :
+            Versions in the order that they were published
+        """
+        return list(self._public_versions)
+
+
+class DimensionStatistics(BaseModel):
+    """
+    Distinct values of a dimension in a resource
+    """
+
+    values: list[bool | str | int | float | None]
+    """
+    Distinct values of the dimension, where None represents a missing value
+
+    The values are in the order they first appear in the resource
+    """
+    counts: list[int]
+    """
+    Number of timeseries with each of the values
+    """
+
+    def cardinality(self) -> int:
+        """
+        Get the number of distinct values
+
+        Returns
+        -------
+        :
+            Number of distinct values, including missing values
+        """
+        return len(self.values)
+
+
+class ResourceStatistics(BaseModel):
+    """
+    Summary of the contents of a resource
+
+    Stored in the `statistics` field of each resource in a Book's `datapackage.json`
+    when the resource is written,
+    so the contents of a resource can be inspected without fetching it.
+    """
+
+    row_count: int
+    """
+    Number of rows in the resource file, excluding the header
+    """
+    timeseries_count: int
+    """
+    Number of timeseries in the resource
+    """
+    year_min: int | None
+    """
+    First year of the timeseries
+    """
+    year_max: int | None
+    """
+    Last year of the timeseries
+    """
+    bytes: int
+    """
+    Size of the resource file
+    """
+    uncompressed_bytes: int
+    """
+    Size of the resource file after decompression
+    """
+    dimensions: dict[str, DimensionStatistics]
+    """
+    Distinct values of each dimension of the metadata
+    """
+
+
 class FileDownloadInfo(BaseModel):
     """
     A File to be downloaded as part of a dataset
@@ -220,10 +385,17 @@ class NotebookMetadata(BaseModel):
         """
         Download a dataset file
 
-        Uses `pooch` to manage the downloading, verification and caching of data file.
-        The first call will trigger a download and subsequent calls may use the cached
+        The first call will trigger a download and subsequent calls use the cached
         file if the previous download succeeded.
 
+        Files are cached in the
+        [BOOKSHELF_DOWNLOAD_CACHE_LOCATION](/configuration/#bookshelf_download_cache_location).
+        Files with a known hash are stored by hash,
+        so a file is only downloaded once even if it is used by multiple versions
+        or is available from multiple URLs.
+        A lock ensures that only one process downloads a given file at a time
+        while any other processes wait and then reuse the result.
+
         Parameters
         ----------
         idx
@@ -236,27 +408,61 @@ class NotebookMetadata(BaseModel):
         str
             Filename of the locally downloaded file
         """
-        cache_location = get_env_var("DOWNLOAD_CACHE_LOCATION", raise_on_missing=False, default=None)
-
         try:
             file_info = self.dataset.files[idx]
         except IndexError as e:
             raise ValueError("Requested index does not exist") from e
 
-        file_hash: str | None = file_info.hash
-        if not file_hash:
-            # replace an empty string with None
-            file_hash = None
+        return _download_file_info(file_info)
 
-        if file_info.url.startswith("file://"):
-            return os.path.join(get_notebook_directory(), file_info.url[7:])
+    def download_files(self, max_workers: int = DOWNLOAD_MAX_WORKERS) -> list[str]:
+        """
+        Download all the dataset files concurrently
 
-        res: str = pooch.retrieve(
-            file_info.url,
-            known_hash=file_hash,
-            path=cache_location,
-        )
-        return res
+        See [download_file][bookshelf.schema.NotebookMetadata.download_file] for how
+        the files are cached.
+
+        Parameters
+        ----------
+        max_workers
+            Maximum number of files to download at once
+
+            Defaults to [DOWNLOAD_MAX_WORKERS][bookshelf.utils.DOWNLOAD_MAX_WORKERS]
+            to limit the number of connections to the same server
+
+        Returns
+        -------
+        list of str
+            Filenames of the locally downloaded files in the same order as `dataset.files`
+        """
+        if not self.dataset.files:
+            return []
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(max_workers, len(self.dataset.files))
+        ) as executor:
+            return list(executor.map(_download_file_info, self.dataset.files))
+
+
+def _download_file_info(file_info: FileDownloadInfo) -> str:
+    if file_info.url.startswith("file://"):
+        return os.path.join(get_notebook_directory(), file_info.url[7:])
+
+    cache_location = get_env_var("DOWNLOAD_CACHE_LOCATION", raise_on_missing=False, default=None)
+    path = pathlib.Path(cache_location or pooch.os_cache("pooch"))
+
+    # replace an empty string with None
+    file_hash = file_info.hash or None
+    if file_hash is None:
+        # Use the same name as pooch so previously downloaded files are reused
+        local_fname = path / pooch.utils.unique_file_name(file_info.url)
+    else:
+        algorithm = pooch.hashes.hash_algorithm(file_hash)
+        basename = os.path.basename(urllib.parse.urlparse(file_info.url).path) or "download"
+        local_fname = path / "by-hash" / f"{algorithm}-{file_hash.split(':')[-1].lower()}" / basename
+
+    fetch_file(file_info.url, local_fname, known_hash=file_hash)
+    return str(local_fname)
 
 
 class ConfigSchema(BaseModel):
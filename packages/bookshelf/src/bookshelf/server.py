@@ -0,0 +1,294 @@
+"""
+Serve a local bookshelf over HTTP
+
+A local bookshelf uses the same layout as a remote bookshelf,
+so it can be served to other machines (e.g. as an in-cluster cache or mirror)
+and used as the `remote_bookshelf` of a [BookShelf][bookshelf.BookShelf].
+
+The server can be started using `python -m bookshelf.server`.
+
+The local bookshelf only contains the `volume.json` of each volume as it was when last fetched,
+so clients would not see versions published after that.
+An upstream remote bookshelf can be provided to refresh each `volume.json` before it is served.
+"""
+
+from __future__ import annotations
+
+import argparse
+import email.utils
+import functools
+import http.server
+import logging
+import os
+import pathlib
+import re
+import shutil
+from http import HTTPStatus
+from typing import IO, Any
+
+import requests
+
+from bookshelf.utils import build_url, create_local_cache, fetch_file
+
+logger = logging.getLogger(__name__)
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class BookshelfRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """
+    Request handler which serves the files in a bookshelf
+
+    In addition to [http.server.SimpleHTTPRequestHandler][], this handler supports:
+
+    * single byte range requests (`Range` and `If-Range` headers) so downloads can be resumed
+    * `ETag` headers and conditional requests using `If-None-Match`
+    * compressed resources (`.csv.gz`) are passed through as is,
+      so the served bytes match the hashes in `datapackage.json`
+
+    Directory listings and hidden files (e.g. lock files) are not served.
+
+    `volume.json` files are sent with `Cache-Control: no-cache`.
+    If `upstream` is provided, they are refreshed from the upstream remote bookshelf
+    before being sent so that newly published versions are visible.
+    """
+
+    _remaining: int | None = None
+    _no_cache: bool = False
+
+    def __init__(self, *args: Any, upstream: str | None = None, **kwargs: Any):
+        # The request is handled by the base class constructor
+        self.upstream = upstream
+        super().__init__(*args, **kwargs)
+
+    def send_head(self) -> IO[bytes] | None:  # type: ignore[override]
+        """
+        Send the response headers
+
+        Returns
+        -------
+        :
+            File handle positioned at the start of the content to send,
+            or None if there is no content to send
+        """
+        path = self.translate_path(self.path)
+        # Only the location within the bookshelf is checked for hidden files,
+        # as the bookshelf itself is often in a hidden directory (e.g. ~/.cache)
+        relative_parts = pathlib.PurePath(os.path.relpath(path, self.directory)).parts
+        if os.path.isdir(path) or any(part.startswith(".") for part in relative_parts):
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+
+        # The volume metadata lists the available versions so must not be stale
+        self._no_cache = relative_parts[1:] == ("volume.json",)
+        if self._no_cache and self.upstream:
+            _refresh(pathlib.Path(path), build_url(self.upstream, *relative_parts))
+
+        try:
+            file_handle = open(path, "rb")
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+
+        try:
+            return self._send_file_head(file_handle)
+        except Exception:
+            file_handle.close()
+            raise
+
+    def _send_file_head(self, file_handle: IO[bytes]) -> IO[bytes] | None:
+        stat = os.fstat(file_handle.fileno())
+        size = stat.st_size
+        etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+
+        if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            file_handle.close()
+            return None
+
+        byte_range = None
+        if "Range" in self.headers and self.headers.get("If-Range", etag) == etag:
+            byte_range = _parse_range(self.headers["Range"], size)
+            if byte_range is None:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                file_handle.close()
+                return None
+
+        if byte_range is None:
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Length", str(size))
+            self._remaining = None
+        else:
+            start, end = byte_range
+            self.send_response(HTTPStatus.PARTIAL_CONTENT)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            self.send_header("Content-Length", str(end - start + 1))
+            file_handle.seek(start)
+            self._remaining = end - start + 1
+
+        self.send_header("Content-Type", self.guess_type(self.translate_path(self.path)))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", email.utils.formatdate(stat.st_mtime, usegmt=True))
+        if self._no_cache:
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        return file_handle
+
+    def copyfile(self, source: Any, outputfile: Any) -> None:
+        """
+        Copy the requested content to the response
+        """
+        if self._remaining is None:
+            shutil.copyfileobj(source, outputfile)
+            return
+
+        remaining = self._remaining
+        while remaining > 0:
+            chunk = source.read(min(remaining, 64 * 1024))
+            if not chunk:
+                break
+            outputfile.write(chunk)
+            remaining -= len(chunk)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """
+        Log requests using the logging module rather than stderr
+        """
+        logger.info(f"{self.address_string()} - {format % args}")
+
+
+def _refresh(path: pathlib.Path, url: str) -> None:
+    try:
+        fetch_file(url, path, force=True)
+    except (requests.exceptions.RequestException, OSError, ValueError) as exc:
+        logger.warning(f"Could not refresh {path} from {url} ({exc}). Serving the cached copy")
+
+
+def _parse_range(value: str, size: int) -> tuple[int, int] | None:
+    # Only single ranges are supported
+    match = _RANGE_RE.match(value.strip())
+    if match is None or match.group(1) == match.group(2) == "":
+        return None
+
+    start_str, end_str = match.groups()
+    if start_str == "":
+        # Suffix range e.g. "bytes=-500"
+        start = max(size - int(end_str), 0)
+        end = size - 1
+    else:
+        start = int(start_str)
+        end = min(int(end_str), size - 1) if end_str else size - 1
+
+    if start > end or start >= size:
+        return None
+    return start, end
+
+
+def create_server(
+    path: str | pathlib.Path | None = None,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    upstream: str | None = None,
+) -> http.server.ThreadingHTTPServer:
+    """
+    Create a server for a local bookshelf
+
+    The files are served using the same layout as a remote bookshelf
+    (`{name}/volume.json`, `{name}/{version}_e{edition}/...`)
+    so the URL of the server can be used as the `remote_bookshelf` of a
+    [BookShelf][bookshelf.BookShelf].
+
+    A local bookshelf only contains the resources which have been used,
+    so any missing files result in a 404 response.
+    Clients can list the server as a mirror ahead of the upstream remote bookshelf
+    to fall back to the upstream for these files.
+
+    Each `volume.json` lists the versions of a volume and is only as fresh as the
+    local bookshelf unless `upstream` is provided.
+
+    Parameters
+    ----------
+    path
+        Local bookshelf to serve
+
+        Defaults to the default local cache location
+    host
+        Address to listen on
+    port
+        Port to listen on. Use 0 to select a free port
+    upstream
+        URL of the upstream remote bookshelf (e.g. `https://bookshelf.local/v0.1`)
+
+        If provided, each `volume.json` is refreshed from the upstream before it is served.
+        The cached copy is served if the upstream can't be reached.
+
+    Returns
+    -------
+    :
+        The server, which has not been started yet
+    """
+    if path is None:
+        path = create_local_cache(path)
+    handler = functools.partial(BookshelfRequestHandler, directory=str(path), upstream=upstream)
+    return http.server.ThreadingHTTPServer((host, port), handler)
+
+
+def serve(
+    path: str | pathlib.Path | None = None,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    upstream: str | None = None,
+) -> None:
+    """
+    Serve a local bookshelf until interrupted
+
+    See [create_server][bookshelf.server.create_server] for more information.
+
+    Parameters
+    ----------
+    path
+        Local bookshelf to serve
+
+        Defaults to the default local cache location
+    host
+        Address to listen on
+    port
+        Port to listen on
+    upstream
+        URL of the upstream remote bookshelf used to refresh each `volume.json`
+    """
+    with create_server(path, host, port, upstream=upstream) as server:
+        server_host, server_port = server.server_address[:2]
+        logger.info(f"Serving {path or 'the local bookshelf'} on http://{server_host!s}:{server_port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("Stopping server")
+
+
+def main() -> None:
+    """
+    Serve a local bookshelf from the command line
+    """
+    parser = argparse.ArgumentParser(description="Serve a local bookshelf over HTTP")
+    parser.add_argument("path", nargs="?", help="Local bookshelf to serve")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument(
+        "--upstream",
+        help="URL of the upstream remote bookshelf used to refresh the list of versions of each volume",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    serve(args.path, host=args.host, port=args.port, upstream=args.upstream)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,20 +2,24 @@
 A BookShelf is a collection of Books that can be queried and fetched as needed.
 """
 
+import functools
 import json
 import logging
 import pathlib
+from collections.abc import Sequence
 
 import requests.exceptions
 
 from bookshelf.book import LocalBook
 from bookshelf.errors import UnknownBook, UnknownEdition, UnknownVersion
-from bookshelf.schema import Edition, Version, VolumeMeta
+from bookshelf.schema import Edition, Version, VolumeIndex, VolumeMeta
 from bookshelf.utils import (
     build_url,
     create_local_cache,
     fetch_file,
-    get_remote_bookshelf,
+    get_remote_bookshelves,
+    get_shared_cache_locations,
+    rank_remote_bookshelves,
 )
 
 logger = logging.getLogger(__name__)
@@ -23,7 +27,7 @@ logger = logging.getLogger(__name__)
 
 def fetch_volume_meta(
     name: str,
-    remote_bookshelf: str,
+    remote_bookshelf: str | Sequence[str],
     local_bookshelf: pathlib.Path,
     force: bool = True,
 ) -> VolumeMeta:
@@ -34,8 +38,10 @@ def fetch_volume_meta(
     ----------
     name : str
         Name of the volume to fetch
-    remote_bookshelf : str
+    remote_bookshelf : str or list of str
         URL for the remote bookshelf
+
+        If multiple URLs are provided, they are tried in order until one succeeds
     local_bookshelf : pathlib.Path
         Local path where downloaded books will be stored.
 
@@ -47,17 +53,68 @@ def fetch_volume_meta(
     -------
     VolumeMeta
     """
+    local_fname = _fetch_volume_meta_file(name, remote_bookshelf, local_bookshelf, force)
+
+    with open(str(local_fname)) as file_handle:
+        data = json.load(file_handle)
+
+    return VolumeMeta(**data)
+
+
+def fetch_volume_index(
+    name: str,
+    remote_bookshelf: str | Sequence[str],
+    local_bookshelf: pathlib.Path,
+    force: bool = True,
+) -> VolumeIndex:
+    """
+    Fetch an index of the books available for a given volume
+
+    The index is memoised on the contents of `volume.json`
+    so the metadata is only parsed again if it has changed.
+
+    Parameters
+    ----------
+    name : str
+        Name of the volume to fetch
+    remote_bookshelf : str or list of str
+        URL for the remote bookshelf
+
+        If multiple URLs are provided, they are tried in order until one succeeds
+    local_bookshelf : pathlib.Path
+        Local path where downloaded books will be stored.
+
+        Must be a writable directory
+    force: bool
+        If True metadata is always fetched from the remote bookshelf
+
+    Returns
+    -------
+    VolumeIndex
+    """
+    local_fname = _fetch_volume_meta_file(name, remote_bookshelf, local_bookshelf, force)
+
+    return _build_volume_index(local_fname.read_bytes())
+
+
+def _fetch_volume_meta_file(
+    name: str,
+    remote_bookshelf: str | Sequence[str],
+    local_bookshelf: pathlib.Path,
+    force: bool,
+) -> pathlib.Path:
     fname = "volume.json"
 
     local_fname = local_bookshelf / name / fname
-    url = build_url(remote_bookshelf, name, fname)
+    urls = [build_url(remote, name, fname) for remote in get_remote_bookshelves(remote_bookshelf)]
 
-    fetch_file(url, local_fname, force=force)
+    fetch_file(urls, local_fname, force=force)
+    return local_fname
 
-    with open(str(local_fname)) as file_handle:
-        data = json.load(file_handle)
 
-    return VolumeMeta(**data)
+@functools.lru_cache(maxsize=32)
+def _build_volume_index(content: bytes) -> VolumeIndex:
+    return VolumeIndex(VolumeMeta(**json.loads(content)))
 
 
 class BookShelf:
@@ -66,6 +123,21 @@ class BookShelf:
 
     If a Book isn't available locally, it will be queried from the remote bookshelf.
 
+    Optionally, one or more shared bookshelves (e.g. a directory on a network filesystem
+    shared between nodes) can be used as additional cache tiers between the local
+    and remote bookshelves.
+    Files missing from the local bookshelf are copied from the first shared bookshelf
+    that contains them, and files fetched from the remote bookshelf are also stored
+    in the shared bookshelves, so a shared bookshelf only needs to be populated once.
+
+    Multiple remote bookshelves (mirrors) can be provided.
+    These are ranked by latency and files are fetched from the fastest mirror,
+    falling back to the other mirrors if a request fails or times out.
+    The hashes in a Book's `datapackage.json` ensure that every mirror serves the same data.
+
+    A remote bookshelf can also be a `file://` URL pointing to a directory,
+    e.g. a shared volume, which is read without any HTTP requests.
+
     Books can be fetched using [load][bookshelf.BookShelf.load] by name.
     Specific versions of a book can be pinned if needed,
     otherwise the latest version of the book is loaded.
@@ -74,12 +146,15 @@ class BookShelf:
     def __init__(
         self,
         path: str | pathlib.Path | None = None,
-        remote_bookshelf: str | None = None,
+        remote_bookshelf: str | Sequence[str] | None = None,
+        shared_bookshelves: Sequence[str | pathlib.Path] | None = None,
     ):
         if path is None:
             path = create_local_cache(path)
         self.path = pathlib.Path(path)
-        self.remote_bookshelf = get_remote_bookshelf(remote_bookshelf)
+        self.remote_bookshelves = get_remote_bookshelves(remote_bookshelf)
+        self.remote_bookshelf = self.remote_bookshelves[0]
+        self.shared_bookshelves = get_shared_cache_locations(shared_bookshelves)
 
     def load(
         self,
@@ -127,22 +202,33 @@ class BookShelf:
         metadata_fname = self.path / metadata_fragment
         if not metadata_fname.exists():
             try:
-                url = build_url(
-                    self.remote_bookshelf,
-                    *LocalBook.path_parts(name, version, edition, "datapackage.json"),
-                )
+                urls = [
+                    build_url(remote, *LocalBook.path_parts(name, version, edition, "datapackage.json"))
+                    for remote in self._ranked_remote_bookshelves()
+                ]
                 fetch_file(
-                    url,
+                    urls,
                     local_fname=metadata_fname,
                     known_hash=None,
                     force=force,
+                    shared_fnames=[shared / metadata_fragment for shared in self.shared_bookshelves],
                 )
-            except requests.exceptions.HTTPError as http_error:
-                raise UnknownVersion(name, version) from http_error
+            except (requests.exceptions.HTTPError, FileNotFoundError) as exc:
+                raise UnknownVersion(name, version) from exc
 
         if not metadata_fname.exists():
             raise AssertionError()
-        return LocalBook(name, version, edition, local_bookshelf=self.path)
+        return LocalBook(
+            name,
+            version,
+            edition,
+            local_bookshelf=self.path,
+            shared_bookshelves=self.shared_bookshelves,
+            bookshelf=self._ranked_remote_bookshelves(),
+        )
+
+    def _ranked_remote_bookshelves(self) -> list[str]:
+        return rank_remote_bookshelves(self.remote_bookshelves)
 
     def is_available(
         self,
@@ -208,22 +294,22 @@ class BookShelf:
     ) -> tuple[Version, Edition]:
         # Update the package metadata
         try:
-            meta = fetch_volume_meta(name, self.remote_bookshelf, self.path)
-        except requests.exceptions.HTTPError as http_error:
-            raise UnknownBook(f"No metadata for {name!r}") from http_error
+            index = fetch_volume_index(name, self._ranked_remote_bookshelves(), self.path)
+        except (requests.exceptions.HTTPError, FileNotFoundError) as exc:
+            raise UnknownBook(f"No metadata for {name!r}") from exc
 
         if version is None:
-            version = meta.get_latest_version()
+            version = index.get_latest_version()
 
         # Verify that the version exists
-        matching_version_books = meta.get_version(version)
+        matching_version_books = index.get_version(version)
         if not matching_version_books:
             raise UnknownVersion(name, version)
 
         # Find edition
         if edition is None:
             edition = matching_version_books[-1].edition
-        if edition not in [b.edition for b in matching_version_books]:
+        if not any(b.edition == edition for b in matching_version_books):
             raise UnknownEdition(name, version, edition)
         return version, edition
 
@@ -242,11 +328,11 @@ class BookShelf:
             List of available versions
         """
         try:
-            meta = fetch_volume_meta(name, self.remote_bookshelf, self.path)
-        except requests.exceptions.HTTPError as http_error:
-            raise UnknownBook(f"No metadata for {name!r}") from http_error
+            index = fetch_volume_index(name, self._ranked_remote_bookshelves(), self.path)
+        except (requests.exceptions.HTTPError, FileNotFoundError) as exc:
+            raise UnknownBook(f"No metadata for {name!r}") from exc
 
-        return [version.version for version in meta.versions if not version.private]
+        return index.list_versions()
 
     def list_books(self) -> list[str]:
         """
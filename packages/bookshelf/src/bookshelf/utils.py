@@ -2,13 +2,27 @@
 Bookshelf utilities
 """
 
+import concurrent.futures
+import contextlib
+import hashlib
+import io
 import logging
+import math
 import os
 import pathlib
-from typing import Any
+import shutil
+import sys
+import time
+import urllib.parse
+import urllib.request
+import uuid
+from collections.abc import Iterator, Sequence
+from http import HTTPStatus
+from typing import IO, Any
 
 import platformdirs
 import pooch
+import requests
 
 from bookshelf.constants import (
     DATA_FORMAT_VERSION,
@@ -17,8 +31,28 @@ from bookshelf.constants import (
     ROOT_DIR,
 )
 
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
 logger = logging.getLogger(__file__)
 
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+"""Size of the chunks, in bytes, written while streaming a download"""
+DOWNLOAD_MIN_SEGMENT_SIZE = 16 * 1024 * 1024
+"""Minimum size, in bytes, of each concurrently downloaded segment of a file"""
+DOWNLOAD_TIMEOUT = 30
+"""Timeout, in seconds, used when connecting to or waiting on a remote bookshelf"""
+DOWNLOAD_RETRY_COUNT = 3
+"""Number of times an interrupted download of a Book's file is resumed"""
+DOWNLOAD_MAX_WORKERS = 4
+"""Default number of files which are downloaded at once"""
+REMOTE_PROBE_TIMEOUT = 5
+"""Timeout, in seconds, used when measuring the latency of a remote bookshelf"""
+REMOTE_FAILURE_TTL = 300
+"""Time, in seconds, before an unreachable or failing remote bookshelf is probed again"""
+
 
 def default_cache_location() -> str:
     r"""
@@ -76,15 +110,34 @@ def create_local_cache(path: str | pathlib.Path | None = None) -> pathlib.Path:
     return pathlib.Path(path)  # type: ignore
 
 
-def download(
+def download(  # noqa: PLR0913
     url: str,
     local_fname: pathlib.Path,
     known_hash: str | None = None,
     progressbar: bool = False,
     retry_count: int = 0,
+    segments: int = 1,
 ) -> None:
     """
-    Download a remote file using pooch's downloader
+    Download a remote file
+
+    HTTP(S) URLs are streamed into a hidden partial file (`.{name}.part`) next to `local_fname`.
+    If the transfer is interrupted,
+    it is resumed from the end of the partial file using an HTTP Range request
+    rather than restarting from the beginning.
+    Servers which don't support range requests fall back to restarting the download.
+    The hash of the complete file is verified before it is moved to `local_fname`.
+
+    If a `known_hash` is provided, a partial file left behind by a previously failed
+    download is also resumed.
+
+    `file://` URLs are read directly from disk without any HTTP requests
+    (see [file_url_to_path][bookshelf.utils.file_url_to_path]).
+    If a `known_hash` is provided the file is hardlinked into place where possible,
+    otherwise it is copied.
+
+    Other URL schemes, or downloads with a progress bar,
+    use pooch's downloaders which do not support resuming.
 
     Parameters
     ----------
@@ -93,21 +146,247 @@ def download(
     local_fname
         Path where the result will be stored
     known_hash
+        Expected hash of the file
+
+        If the hash of the downloaded file doesn't match a ValueError is raised.
     progressbar: bool
         If true, show a progress bar showing the download process
     retry_count: int
         The number of retries to attempt
+    segments: int
+        Number of byte ranges of the file to download concurrently
+
+        Only used if the server supports range requests.
+        Each segment is at least [DOWNLOAD_MIN_SEGMENT_SIZE][bookshelf.utils.DOWNLOAD_MIN_SEGMENT_SIZE]
+        bytes so small files are always downloaded as a single segment.
+
+    Raises
+    ------
+    ValueError
+        Failing hash check for the downloaded file
+    requests.exceptions.HTTPError
+        The server returned an error
+    FileNotFoundError
+        A `file://` URL doesn't exist
+    """
+    if url.startswith("file://"):
+        _copy_local_file(file_url_to_path(url), local_fname, known_hash)
+        return
+
+    if progressbar or not url.startswith(("http://", "https://")):
+        downloader = pooch.core.choose_downloader(url, progressbar=progressbar)
+        pooch.core.stream_download(
+            url,
+            fname=local_fname,
+            known_hash=known_hash,
+            downloader=downloader,
+            retry_if_failed=retry_count,
+        )
+        return
+
+    local_fname.parent.mkdir(parents=True, exist_ok=True)
+    part_fname = local_fname.parent / f".{local_fname.name}.part"
+    if known_hash is None:
+        # Without a hash a stale partial file can't be detected so always start afresh
+        part_fname.unlink(missing_ok=True)
+
+    ranged_info = _get_range_info(url) if segments > 1 else None
+    if ranged_info is not None:
+        segments = min(segments, max(1, ranged_info[0] // DOWNLOAD_MIN_SEGMENT_SIZE))
+    if ranged_info is not None and segments > 1:
+        size, validator = ranged_info
+        try:
+            _download_segments(url, part_fname, size, validator, segments, retry_count)
+        except Exception:
+            # A failed segmented download leaves gaps so it can't be resumed later
+            part_fname.unlink(missing_ok=True)
+            raise
+    else:
+        _download_resumable(url, part_fname, retry_count)
+
+    try:
+        pooch.hashes.hash_matches(part_fname, known_hash, strict=True, source=local_fname.name)
+    except ValueError:
+        part_fname.unlink()
+        raise
+    os.replace(part_fname, local_fname)
+
+
+def _copy_local_file(source: pathlib.Path, local_fname: pathlib.Path, known_hash: str | None) -> None:
+    if not source.is_file():
+        raise FileNotFoundError(f"Could not find file {source}")
+    pooch.hashes.hash_matches(source, known_hash, strict=True, source=local_fname.name)
+    local_fname.parent.mkdir(parents=True, exist_ok=True)
+
+    if known_hash is not None:
+        # Files with a known hash are immutable so can share the same data on disk.
+        # Files without a hash (e.g. volume.json) may be updated on the remote so are copied
+        tmp_fname = local_fname.parent / f".{local_fname.name}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.link(source, tmp_fname)
+            os.replace(tmp_fname, local_fname)
+            return
+        except OSError:
+            # Hardlinks aren't supported across filesystems or on some filesystems
+            logger.debug(f"Could not hardlink {source}, copying instead")
+        finally:
+            tmp_fname.unlink(missing_ok=True)
+    copy_file(source, local_fname)
+
+
+def file_url_to_path(url: str) -> pathlib.Path:
     """
-    downloader = pooch.core.choose_downloader(url, progressbar=progressbar)
-    pooch.core.stream_download(
-        url,
-        fname=local_fname,
-        known_hash=known_hash,
-        downloader=downloader,
-        retry_if_failed=retry_count,
+    Convert a `file://` URL to a local path
+
+    Parameters
+    ----------
+    url
+        URL to convert, e.g. `file:///mnt/bookshelf/v0.3.2/volume.json`
+
+    Returns
+    -------
+    :
+        Local path referenced by the URL
+    """
+    return pathlib.Path(urllib.request.url2pathname(urllib.parse.urlparse(url).path))
+
+
+def _is_retryable(exc: requests.exceptions.RequestException) -> bool:
+    if isinstance(exc, requests.exceptions.HTTPError):
+        return exc.response is not None and exc.response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+    return isinstance(
+        exc,
+        requests.exceptions.ConnectionError
+        | requests.exceptions.Timeout
+        | requests.exceptions.ChunkedEncodingError,
+    )
+
+
+def _get_range_info(url: str) -> tuple[int, str | None] | None:
+    # Size and validator of the file if the server supports range requests for the raw bytes
+    response = requests.head(url, allow_redirects=True, timeout=DOWNLOAD_TIMEOUT)
+    try:
+        response.raise_for_status()
+    except requests.exceptions.HTTPError:
+        # Some servers don't support HEAD requests (e.g. presigned URLs) so fall back to a single stream
+        logger.debug(f"HEAD request to {url} failed with status {response.status_code}")
+        return None
+    if response.headers.get("Accept-Ranges") != "bytes":
+        return None
+    if response.headers.get("Content-Encoding", "identity") != "identity":
+        return None
+    if "Content-Length" not in response.headers:
+        return None
+    return int(response.headers["Content-Length"]), response.headers.get(
+        "ETag", response.headers.get("Last-Modified")
     )
 
 
+def _download_resumable(url: str, part_fname: pathlib.Path, retry_count: int) -> None:
+    validator = None
+    resumable = True
+    for attempt in range(retry_count + 1):
+        offset = part_fname.stat().st_size if resumable and part_fname.exists() else 0
+        headers = {}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            if validator:
+                headers["If-Range"] = validator
+        try:
+            with requests.get(url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+                if offset and response.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE:
+                    # The partial file is already complete
+                    return
+                response.raise_for_status()
+                validator = response.headers.get("ETag", response.headers.get("Last-Modified"))
+                # Resuming requires offsets into the raw rather than the decoded content
+                resumable = response.headers.get("Content-Encoding", "identity") == "identity"
+
+                mode = "wb"
+                if response.status_code == HTTPStatus.PARTIAL_CONTENT:
+                    if not response.headers.get("Content-Range", "").startswith(f"bytes {offset}-"):
+                        raise ValueError(f"Unexpected Content-Range returned from {url}")
+                    mode = "ab"
+                elif offset:
+                    logger.info(f"{url} does not support range requests. Restarting download")
+
+                with open(part_fname, mode) as file_handle:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        file_handle.write(chunk)
+            return
+        except requests.exceptions.RequestException as exc:
+            if attempt == retry_count or not _is_retryable(exc):
+                raise
+            received = part_fname.stat().st_size if part_fname.exists() else 0
+            logger.info(
+                f"Download of {url} failed after {received} bytes. "
+                f"Will attempt to resume {retry_count - attempt} more time(s)"
+            )
+            time.sleep(min(attempt + 1, 10))
+
+
+def _download_range(  # noqa: PLR0913
+    url: str,
+    part_fname: pathlib.Path,
+    start: int,
+    end: int,
+    validator: str | None,
+    retry_count: int,
+) -> None:
+    position = start
+    for attempt in range(retry_count + 1):
+        headers = {"Range": f"bytes={position}-{end}"}
+        if validator:
+            headers["If-Range"] = validator
+        try:
+            with requests.get(url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+                response.raise_for_status()
+                if response.status_code != HTTPStatus.PARTIAL_CONTENT:
+                    raise ValueError(f"{url} changed while it was being downloaded")
+                with open(part_fname, "r+b") as file_handle:
+                    file_handle.seek(position)
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        file_handle.write(chunk)
+                        position += len(chunk)
+            if position != end + 1:
+                raise requests.exceptions.ChunkedEncodingError(f"Incomplete range returned from {url}")
+            return
+        except requests.exceptions.RequestException as exc:
+            if attempt == retry_count or not _is_retryable(exc):
+                raise
+            logger.info(f"Download of bytes {start}-{end} of {url} failed at {position}. Resuming")
+            time.sleep(min(attempt + 1, 10))
+
+
+def _download_segments(  # noqa: PLR0913
+    url: str,
+    part_fname: pathlib.Path,
+    size: int,
+    validator: str | None,
+    segments: int,
+    retry_count: int,
+) -> None:
+    with open(part_fname, "wb") as file_handle:
+        file_handle.truncate(size)
+
+    segment_size = -(-size // segments)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=segments) as executor:
+        futures = [
+            executor.submit(
+                _download_range,
+                url,
+                part_fname,
+                start,
+                min(start + segment_size, size) - 1,
+                validator,
+                retry_count,
+            )
+            for start in range(0, size, segment_size)
+        ]
+        for future in futures:
+            future.result()
+
+
 def build_url(bookshelf: str, *paths: str) -> str:
     """
     Build a URL
@@ -129,18 +408,22 @@ def build_url(bookshelf: str, *paths: str) -> str:
 
 
 def fetch_file(
-    url: str,
+    url: str | Sequence[str],
     local_fname: pathlib.Path,
     known_hash: str | None = None,
     force: bool | None = False,
+    shared_fnames: Sequence[pathlib.Path] = (),
 ) -> None:
     """
     Fetch a remote file and store it locally
 
     Parameters
     ----------
-    url : str
+    url : str or list of str
         URL of data file
+
+        If multiple URLs are provided (e.g. the same file on a number of mirrors),
+        they are tried in order until the file is successfully downloaded.
     local_fname : pathlib.Path
         The location of where to store the downloaded file
     known_hash : str
@@ -152,28 +435,366 @@ def fetch_file(
         If no hash is provided, no checks are performed
     force : bool
         If True, always download the file
+    shared_fnames : list of pathlib.Path
+        Locations of the same file in slower, shared cache tiers (fastest first)
+
+        If the file is missing locally, these locations are checked in order before
+        downloading the file from `url`.
+        A file found in a shared tier is copied locally and into any faster shared tiers.
+        A downloaded file is copied into every shared tier.
+        Files in a shared tier which don't match `known_hash` are ignored.
+        Shared tiers are ignored if `force` is True.
 
     Raises
     ------
     ValueError
         Failing hash check for the output file
     FileNotFoundError
-        Downloaded file was not in the expected location
+        A `file://` URL doesn't exist or the downloaded file was not in the expected location
 
+    Notes
+    -----
+    This is safe to call from multiple processes at once.
+    A lock file next to `local_fname` ensures that only a single process downloads the file,
+    while the other processes wait and then reuse the result.
+    The file is downloaded to a temporary file and only moved into place once it is
+    complete and has been verified,
+    so a partially written file is never visible at `local_fname`.
     """
     if not force and local_fname.exists():
-        if pooch.hashes.hash_matches(local_fname, known_hash):
-            return
+        _check_existing_file(local_fname, known_hash)
+        return
+
+    local_fname.parent.mkdir(parents=True, exist_ok=True)
+    mtime_before_lock = _get_mtime(local_fname)
+    with file_lock(get_lock_fname(local_fname)):
+        # Another process may have fetched the file while we were waiting for the lock
+        if local_fname.exists():
+            if not force:
+                _check_existing_file(local_fname, known_hash)
+                return
+            if _get_mtime(local_fname) != mtime_before_lock:
+                logger.debug(f"{local_fname} was refreshed by another process")
+                return
+
+        if not force:
+            for idx, shared_fname in enumerate(shared_fnames):
+                if shared_fname.exists() and pooch.hashes.hash_matches(shared_fname, known_hash):
+                    copy_file(shared_fname, local_fname)
+                    logger.info(f"{local_fname} copied from {shared_fname}")
+                    _fill_shared_tiers(local_fname, shared_fnames[:idx])
+                    return
+
+        urls = [url] if isinstance(url, str) else list(url)
+        candidate_url = _download_from_mirrors(urls, local_fname, known_hash)
+        logger.info(f"{local_fname} downloaded from {candidate_url}")
+        _fill_shared_tiers(local_fname, shared_fnames)
+
+    if not local_fname.exists():
+        raise FileNotFoundError(f"Could not find file {local_fname}")  # pragma: no cover
+
+
+def _download_from_mirrors(urls: list[str], local_fname: pathlib.Path, known_hash: str | None) -> str:
+    # Try each URL in turn, returning the URL which was used
+    segments = int(get_env_var("DOWNLOAD_SEGMENTS", raise_on_missing=False, default=1))
+    missing_exc: Exception | None = None
+    for idx, candidate_url in enumerate(urls):
+        try:
+            download(
+                candidate_url,
+                local_fname=local_fname,
+                known_hash=known_hash,
+                retry_count=DOWNLOAD_RETRY_COUNT,
+                segments=segments,
+            )
+            return candidate_url
+        except (requests.exceptions.RequestException, FileNotFoundError, ValueError) as exc:
+            if _is_missing_file(exc):
+                missing_exc = missing_exc or exc
+            else:
+                _record_remote_failure(candidate_url)
+            if idx == len(urls) - 1:
+                # A remote reporting the file as missing is more informative
+                # than another remote being unavailable
+                if missing_exc is not None and missing_exc is not exc:
+                    raise missing_exc from exc
+                raise
+            logger.warning(f"Could not fetch {candidate_url} ({exc}). Trying {urls[idx + 1]}")
+    raise ValueError("No URLs to fetch")
+
+
+def _is_missing_file(exc: Exception) -> bool:
+    # Missing files aren't a problem with the remote itself
+    if isinstance(exc, FileNotFoundError):
+        return True
+    return isinstance(exc, requests.exceptions.HTTPError) and not _is_retryable(exc)
+
+
+class _HashingReader(io.RawIOBase):
+    # Hashes the data read from a binary stream
+    def __init__(self, raw: Any, algorithm: str):
+        self._raw = raw
+        self._hasher = hashlib.new(algorithm)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        data = self._raw.read(len(buffer))
+        size = len(data)
+        buffer[:size] = data
+        self._hasher.update(data)
+        return size
+
+    def hexdigest(self) -> str:
+        # Include any data that wasn't read by the consumer of the stream
+        while data := self._raw.read(DOWNLOAD_CHUNK_SIZE):
+            self._hasher.update(data)
+        return self._hasher.hexdigest()
+
+
+def _open_url(url: str, stack: contextlib.ExitStack) -> Any:
+    if url.startswith("file://"):
+        return stack.enter_context(open(file_url_to_path(url), "rb"))
+
+    response = stack.enter_context(requests.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT))
+    response.raise_for_status()
+    # Match the content written by download
+    response.raw.decode_content = True
+    return response.raw
+
+
+@contextlib.contextmanager
+def stream_file(url: str | Sequence[str], known_hash: str | None = None) -> Iterator[IO[bytes]]:
+    """
+    Read a remote file without storing it locally
+
+    The file is hashed as it is read and the hash is verified once the stream
+    is closed.
+
+    Parameters
+    ----------
+    url : str or list of str
+        URL of data file
+
+        If multiple URLs are provided (e.g. the same file on a number of mirrors),
+        they are tried in order until a request succeeds.
+    known_hash : str
+        Expected hash of the file
+
+        If no hash is provided, no checks are performed
+
+    Raises
+    ------
+    ValueError
+        Failing hash check for the file.
+        Any data read from the stream should be discarded
+    requests.exceptions.HTTPError
+        The server returned an error
+    FileNotFoundError
+        A `file://` URL doesn't exist
+
+    Yields
+    ------
+    :
+        Binary file handle of the remote file
+    """
+    urls = [url] if isinstance(url, str) else list(url)
+    with contextlib.ExitStack() as stack:
+        for idx, candidate_url in enumerate(urls):
+            try:
+                raw = _open_url(candidate_url, stack)
+                break
+            except (requests.exceptions.RequestException, FileNotFoundError) as exc:
+                if not _is_missing_file(exc):
+                    _record_remote_failure(candidate_url)
+                if idx == len(urls) - 1:
+                    raise
+                logger.warning(f"Could not fetch {candidate_url} ({exc}). Trying {urls[idx + 1]}")
+
+        algorithm = pooch.hashes.hash_algorithm(known_hash) if known_hash else "sha256"
+        reader = _HashingReader(raw, algorithm)
+        yield io.BufferedReader(reader, buffer_size=DOWNLOAD_CHUNK_SIZE)
+
+        if known_hash:
+            expected = known_hash.split(":")[-1].lower()
+            digest = reader.hexdigest()
+            if digest != expected:
+                raise ValueError(
+                    f"{algorithm.upper()} hash of streamed file ({digest}) does not match "
+                    f"the known hash ({expected}) for {candidate_url}"
+                )
+        logger.info(f"Streamed {candidate_url}")
+
+
+def copy_file(source: pathlib.Path, target: pathlib.Path) -> None:
+    """
+    Copy a file atomically
+
+    The file is copied to a temporary file next to `target` which is then
+    renamed so a partially copied file is never visible at `target`.
+
+    Parameters
+    ----------
+    source
+        File to copy
+    target
+        Destination of the copy
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_fname = target.parent / f".{target.name}.{uuid.uuid4().hex}.tmp"
+    try:
+        shutil.copyfile(source, tmp_fname)
+        os.replace(tmp_fname, target)
+    finally:
+        tmp_fname.unlink(missing_ok=True)
+
+
+def _fill_shared_tiers(local_fname: pathlib.Path, shared_fnames: Sequence[pathlib.Path]) -> None:
+    for shared_fname in shared_fnames:
+        if shared_fname.exists():
+            continue
+        try:
+            copy_file(local_fname, shared_fname)
+            logger.info(f"{shared_fname} filled from {local_fname}")
+        except OSError:
+            # Shared tiers may be read-only for some nodes
+            logger.warning(f"Could not copy {local_fname} to {shared_fname}", exc_info=True)
+
+
+def _check_existing_file(local_fname: pathlib.Path, known_hash: str | None) -> None:
+    if not pooch.hashes.hash_matches(local_fname, known_hash):
         raise ValueError(
             f"Hash for existing file {local_fname} does not match the expected value {known_hash}"
         )
 
-    if force or not local_fname.exists():
-        download(url, local_fname=local_fname, known_hash=known_hash)
-        logger.info(f"{local_fname} downloaded from {url}")
 
-    if not local_fname.exists():
-        raise FileNotFoundError(f"Could not find file {local_fname}")  # pragma: no cover
+def _get_mtime(fname: pathlib.Path) -> int | None:
+    try:
+        return fname.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def get_lock_fname(fname: pathlib.Path) -> pathlib.Path:
+    """
+    Get the name of the lock file used to guard a file
+
+    The lock file is a hidden file in the same directory,
+    so it is not included in the list of a Book's files.
+
+    Parameters
+    ----------
+    fname
+        File to be guarded
+
+    Returns
+    -------
+    :
+        Path of the lock file
+    """
+    return fname.parent / f".{fname.name}.lock"
+
+
+@contextlib.contextmanager
+def file_lock(lock_fname: pathlib.Path) -> Iterator[None]:
+    """
+    Hold an exclusive lock on a file
+
+    The lock is shared between processes (and threads) on the same host
+    and blocks until the lock can be acquired.
+    The lock file is created if needed and is not removed afterwards.
+
+    Parameters
+    ----------
+    lock_fname
+        Path of the lock file
+    """
+    lock_fname.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_fname, "a+b") as file_handle:
+        if sys.platform == "win32":
+            file_handle.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(file_handle.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after ~10 seconds
+                    continue
+            try:
+                yield
+            finally:
+                file_handle.seek(0)
+                msvcrt.locking(file_handle.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(file_handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(file_handle.fileno(), fcntl.LOCK_UN)
+
+
+@contextlib.contextmanager
+def try_file_lock(lock_fname: pathlib.Path) -> Iterator[bool]:
+    """
+    Try to hold an exclusive lock on a file without waiting
+
+    This is the non-blocking equivalent of [file_lock][bookshelf.utils.file_lock].
+
+    Parameters
+    ----------
+    lock_fname
+        Path of the lock file
+
+    Yields
+    ------
+    :
+        True if the lock is held or False if it is already held elsewhere
+    """
+    lock_fname.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_fname, "a+b") as file_handle:
+        try:
+            if sys.platform == "win32":
+                file_handle.seek(0)
+                msvcrt.locking(file_handle.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(file_handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            yield False
+            return
+
+        try:
+            yield True
+        finally:
+            if sys.platform == "win32":
+                file_handle.seek(0)
+                msvcrt.locking(file_handle.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(file_handle.fileno(), fcntl.LOCK_UN)
+
+
+def mark_accessed(fname: str | pathlib.Path) -> None:
+    """
+    Record that a file in the local bookshelf has been used
+
+    The access time of the file is explicitly updated,
+    independently of how the filesystem is mounted (e.g. `noatime`),
+    so that [CacheManager][bookshelf.cache.CacheManager] can evict the least recently used books.
+    The modification time of the file is not changed.
+
+    Missing files and files whose access time can't be updated
+    (e.g. files owned by another user in a shared cache) are ignored.
+
+    Parameters
+    ----------
+    fname
+        File to mark as accessed
+    """
+    try:
+        stat = os.stat(fname)
+        os.utime(fname, ns=(time.time_ns(), stat.st_mtime_ns))
+    except OSError as error:
+        logger.debug(f"Could not mark {fname} as accessed: {error}")
 
 
 def get_env_var(
@@ -225,6 +846,7 @@ def get_remote_bookshelf(bookshelf: str | None) -> str:
     use the [BOOKSHELF_REMOTE](/configuration/#bookshelf_remote) environment variable, or,
     the [DEFAULT_BOOKSHELF][bookshelf.constants.DEFAULT_BOOKSHELF] parameter
     if the environment variable is not present.
+    If the environment variable contains multiple URLs, the first is used.
 
     Parameters
     ----------
@@ -239,10 +861,138 @@ def get_remote_bookshelf(bookshelf: str | None) -> str:
         URL for the remote bookshelf
     """
     if bookshelf is None:
-        return os.environ.get(ENV_PREFIX + "REMOTE", DEFAULT_BOOKSHELF)
+        return get_remote_bookshelves(None)[0]
     return bookshelf
 
 
+def get_remote_bookshelves(bookshelf: str | Sequence[str] | None) -> list[str]:
+    """
+    Get the URLs of a remote bookshelf and its mirrors
+
+    If no bookshelf is provided,
+    use the [BOOKSHELF_REMOTE](/configuration/#bookshelf_remote) environment variable
+    (which may contain multiple whitespace-separated URLs), or,
+    the [DEFAULT_BOOKSHELF][bookshelf.constants.DEFAULT_BOOKSHELF] parameter
+    if the environment variable is not present.
+
+    Parameters
+    ----------
+    bookshelf
+        URL, or URLs, of the bookshelf
+
+        If not provided the URLs are determined as above
+
+    Returns
+    -------
+    :
+        URLs of the remote bookshelf
+    """
+    if bookshelf is None:
+        bookshelf = os.environ.get(ENV_PREFIX + "REMOTE", DEFAULT_BOOKSHELF).split()
+    if isinstance(bookshelf, str):
+        return [bookshelf]
+    if not bookshelf:
+        raise ValueError("At least one remote bookshelf is required")
+    return list(bookshelf)
+
+
+# Latency of each remote bookshelf and when it was measured (using time.monotonic)
+_REMOTE_LATENCY: dict[str, tuple[float, float]] = {}
+
+
+def _measure_latency(bookshelf: str) -> float:
+    if bookshelf.startswith("file://"):
+        return 0.0 if file_url_to_path(bookshelf).is_dir() else math.inf
+
+    start = time.perf_counter()
+    try:
+        # Any response, including an error status, shows that the remote is reachable
+        requests.head(bookshelf, timeout=REMOTE_PROBE_TIMEOUT)
+    except requests.exceptions.RequestException:
+        return math.inf
+    return time.perf_counter() - start
+
+
+def rank_remote_bookshelves(bookshelves: Sequence[str]) -> list[str]:
+    """
+    Order remote bookshelves by latency
+
+    The latency of each remote bookshelf is measured once per process using a HEAD request.
+    Remote bookshelves that can't be reached, or which have failed while fetching a file
+    (see [fetch_file][bookshelf.utils.fetch_file]), are moved to the end.
+    These are probed again once [REMOTE_FAILURE_TTL][bookshelf.utils.REMOTE_FAILURE_TTL]
+    seconds have passed so that transient failures don't demote a remote bookshelf permanently.
+    A single remote bookshelf is never probed.
+
+    Parameters
+    ----------
+    bookshelves
+        URLs of the remote bookshelf and its mirrors
+
+    Returns
+    -------
+    :
+        URLs ordered from lowest to highest latency
+    """
+    if len(bookshelves) <= 1:
+        return list(bookshelves)
+
+    now = time.monotonic()
+    missing = [b for b in bookshelves if b not in _REMOTE_LATENCY or _is_failure_expired(b, now)]
+    if missing:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(missing)) as executor:
+            for bookshelf, latency in zip(missing, executor.map(_measure_latency, missing)):
+                logger.debug(f"Latency of {bookshelf}: {latency:.3f}s")
+                _REMOTE_LATENCY[bookshelf] = latency, now
+
+    # sorted is stable so ties keep the order of preference
+    return sorted(bookshelves, key=lambda b: _REMOTE_LATENCY[b][0])
+
+
+def _is_failure_expired(bookshelf: str, now: float) -> bool:
+    latency, measured_at = _REMOTE_LATENCY[bookshelf]
+    return math.isinf(latency) and now - measured_at >= REMOTE_FAILURE_TTL
+
+
+def _record_remote_failure(url: str) -> None:
+    for bookshelf in _REMOTE_LATENCY:
+        if url.startswith(bookshelf.rstrip("/") + "/"):
+            _REMOTE_LATENCY[bookshelf] = math.inf, time.monotonic()
+
+
+def get_shared_cache_locations(paths: Sequence[str | pathlib.Path] | None = None) -> list[pathlib.Path]:
+    """
+    Get the shared cache tiers
+
+    If no paths are provided,
+    use the [BOOKSHELF_SHARED_CACHE_LOCATION](/configuration/#bookshelf_shared_cache_location)
+    environment variable.
+    This variable may contain multiple directories separated by `os.pathsep` (":" on Unix).
+    As with the local cache, the
+    [DATA_FORMAT_VERSION][bookshelf.constants.DATA_FORMAT_VERSION] is appended to each directory
+    from the environment variable.
+
+    Parameters
+    ----------
+    paths
+        Directories of the shared tiers, fastest first
+
+        If provided, these are used as is
+
+    Returns
+    -------
+    :
+        Directories of the shared cache tiers
+    """
+    if paths is not None:
+        return [pathlib.Path(p) for p in paths]
+
+    value = get_env_var("SHARED_CACHE_LOCATION", raise_on_missing=False)
+    if not value:
+        return []
+    return [pathlib.Path(p) / DATA_FORMAT_VERSION for p in value.split(os.pathsep) if p]
+
+
 def get_notebook_directory(nb_dir: str | None = None) -> str:
     """
     Get the root location of the notebooks used to generate books
@@ -1,3 +1,4 @@
+import hashlib
 import json
 import os
 
@@ -86,3 +87,15 @@ def remote_bookshelf(requests_mock, monkeypatch):
     bs = MockRemoteBookshelf()
 
     yield bs
+
+
+@pytest.fixture()
+def sha256():
+    """
+    Get the sha256 hash of some content as a hex string
+    """
+
+    def _sha256(content):
+        return hashlib.sha256(content).hexdigest()
+
+    return _sha256
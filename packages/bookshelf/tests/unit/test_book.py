@@ -1,4 +1,6 @@
+import gzip
 import hashlib
+import json
 import os
 
 import datapackage
@@ -7,7 +9,7 @@ import pytest
 import scmdata.testing
 from pandas.testing import assert_frame_equal
 
-from bookshelf.book import LocalBook
+from bookshelf.book import LocalBook, aggregate_timeseries
 from bookshelf.constants import DATA_FORMAT_VERSION, TEST_DATA_DIR
 from bookshelf.shelf import BookShelf
 
@@ -118,6 +120,38 @@ def test_timeseries_remote(example_data, remote_bookshelf):
         book.timeseries("other")
 
 
+def test_fetch_resource(example_data, remote_bookshelf):
+    book = BookShelf().load("test", "v1.0.0")
+    fname = book.fetch_resource("leakage_rates_low")
+
+    assert fname == book.local_fname("test_v1.0.0_e001_leakage_rates_low_wide.csv")
+    scmdata.testing.assert_scmdf_almost_equal(example_data, scmdata.ScmRun(fname))
+    with pytest.raises(ValueError, match="Unknown timeseries 'leakage_rates_low_long'"):
+        book.fetch_resource("leakage_rates_low", shape="long")
+
+
+def test_timeseries_remote_no_cache(example_data, remote_bookshelf):
+    book = BookShelf().load("test", "v1.0.0")
+    fname = book.local_fname("test_v1.0.0_e001_leakage_rates_low_wide.csv")
+
+    scmdata.testing.assert_scmdf_almost_equal(example_data, book.timeseries("leakage_rates_low", cache=False))
+    assert not os.path.exists(fname)
+
+    remote_bookshelf.mocker.get(book.url("test_v1.0.0_e001_leakage_rates_low_wide.csv"), text="corrupted")
+    with pytest.raises(ValueError, match="hash of streamed file"):
+        book.timeseries("leakage_rates_low", cache=False)
+    assert not os.path.exists(fname)
+
+
+def test_timeseries_local_no_cache(example_data, example_long_format_data, requests_mock):
+    book = LocalBook.create_new("test", "v1.1.0")
+    book.add_timeseries("test", example_data)
+
+    scmdata.testing.assert_scmdf_almost_equal(example_data, book.timeseries("test", cache=False))
+    assert_frame_equal(example_long_format_data, book.get_long_format_data("test", cache=False))
+    assert requests_mock.call_count == 0
+
+
 def test_metadata():
     book = LocalBook(
         "example",
@@ -158,3 +192,127 @@ def test_files(local_bookshelf):
     book_files = book.files()
     assert len(book_files) == 1
     assert book_files[0] == os.path.join(book.local_fname("datapackage.json"))
+
+
+@pytest.fixture()
+def country_data():
+    return scmdata.ScmRun(
+        [[1.0, 3.0, 5.0, 7.0], [2.0, 4.0, 6.0, 8.0]],
+        index=[2020, 2030],
+        columns={
+            "model": "test",
+            "scenario": "historical",
+            "region": ["AUS", "NZL", "CHN", "AUS"],
+            "variable": "Emissions|CO2",
+            "unit": ["Mt CO2/yr", "Mt CO2/yr", "Mt CO2/yr", "Gt CO2/yr"],
+        },
+    )
+
+
+def test_aggregate_timeseries(country_data):
+    res = aggregate_timeseries(country_data, {"region": {"AUS": "OECD", "NZL": "OECD"}})
+    assert res.get_unique_meta("region") == ["OECD"]
+    assert res.filter(unit="Mt CO2/yr").values.tolist() == [[4.0, 6.0]]
+    assert res.filter(unit="Gt CO2/yr").values.tolist() == [[7.0, 8.0]]
+
+    res = aggregate_timeseries(country_data, {"region": "World"})
+    assert res.filter(unit="Mt CO2/yr").values.tolist() == [[9.0, 12.0]]
+
+    with pytest.raises(ValueError, match="Unknown dimension 'sector'"):
+        aggregate_timeseries(country_data, {"sector": "Total"})
+
+
+def test_add_timeseries_aggregations(country_data):
+    book = LocalBook.create_new("test", "v1.1.0")
+    book.add_timeseries("by_country", country_data, aggregations={"world": {"region": "World"}})
+
+    resources = {r["name"]: r for r in book.metadata()["resources"]}
+    assert sorted(resources) == [
+        "by_country_long",
+        "by_country_wide",
+        "by_country_world_long",
+        "by_country_world_wide",
+    ]
+    assert resources["by_country_world_wide"]["aggregate"] == "world"
+    assert resources["by_country_world_wide"]["filename"] == "test_v1.1.0_e001_by_country_world_wide.csv.gz"
+    assert "aggregate" not in resources["by_country_wide"]
+
+    scmdata.testing.assert_scmdf_almost_equal(
+        aggregate_timeseries(country_data, {"region": "World"}),
+        book.timeseries("by_country", aggregate="world"),
+    )
+    assert book.get_long_format_data("by_country", aggregate="world")["region"].unique().tolist() == ["World"]
+    with pytest.raises(ValueError, match="Unknown timeseries 'by_country_r5_wide'"):
+        book.timeseries("by_country", aggregate="r5")
+
+
+def test_add_timeseries_existing_resource(country_data):
+    book = LocalBook.create_new("test", "v1.1.0")
+    book.add_timeseries("by_country", country_data, aggregations={"world": {"region": "World"}})
+    original = book.metadata()["resources"]
+
+    with pytest.raises(ValueError, match="Book already contains a resource named 'by_country_world_wide'"):
+        book.add_timeseries("by_country_world", country_data)
+    with pytest.raises(ValueError, match="Book already contains a resource named 'by_country_wide'"):
+        book.add_timeseries("by_country", country_data)
+
+    assert book.metadata()["resources"] == original
+
+    # Nothing is written if any of the resources already exist
+    book.add_timeseries("other_world", country_data)
+    with pytest.raises(ValueError, match="Book already contains a resource named 'other_world_wide'"):
+        book.add_timeseries("other", country_data, aggregations={"world": {"region": "World"}})
+    assert "other_wide" not in [r["name"] for r in book.metadata()["resources"]]
+    scmdata.testing.assert_scmdf_almost_equal(
+        aggregate_timeseries(country_data, {"region": "World"}),
+        book.timeseries("by_country", aggregate="world"),
+    )
+
+
+def test_resource_statistics(country_data):
+    book = LocalBook.create_new("test", "v1.1.0")
+    book.add_timeseries("by_country", country_data)
+
+    stats = book.resource_statistics("by_country")
+    assert stats.row_count == 4
+    assert stats.timeseries_count == 4
+    assert (stats.year_min, stats.year_max) == (2020, 2030)
+    assert stats.bytes == os.path.getsize(book.local_fname("test_v1.1.0_e001_by_country_wide.csv.gz"))
+    with gzip.open(book.local_fname("test_v1.1.0_e001_by_country_wide.csv.gz")) as file_handle:
+        assert stats.uncompressed_bytes == len(file_handle.read())
+    assert stats.dimensions["region"].values == ["AUS", "CHN", "NZL"]
+    assert stats.dimensions["region"].counts == [2, 1, 1]
+    assert stats.dimensions["region"].cardinality() == 3
+
+    long_stats = book.resource_statistics("by_country", shape="long")
+    assert long_stats.row_count == 8
+    assert long_stats.dimensions == stats.dimensions
+
+    # Books written without statistics
+    with open(book.local_fname("datapackage.json")) as file_handle:
+        metadata = json.load(file_handle)
+    for resource in metadata["resources"]:
+        del resource["statistics"]
+    with open(book.local_fname("datapackage.json"), "w") as file_handle:
+        json.dump(metadata, file_handle)
+    assert LocalBook("test", "v1.1.0").resource_statistics("by_country") is None
+
+
+def test_resource_statistics_bool(country_data):
+    country_data["flag"] = [True, False, True, True]
+    book = LocalBook.create_new("test", "v1.1.0")
+    book.add_timeseries("by_country", country_data)
+
+    stats = LocalBook("test", "v1.1.0").resource_statistics("by_country")
+    assert stats.dimensions["flag"].values == [False, True]
+    assert stats.dimensions["flag"].counts == [1, 3]
+
+
+def test_resource_statistics_missing_values(example_data):
+    book = LocalBook.create_new("test", "v1.1.0")
+    book.add_timeseries("test", example_data, compressed=False)
+
+    stats = book.resource_statistics("test")
+    assert stats.uncompressed_bytes == stats.bytes
+    assert stats.dimensions["model"].values == [None]
+    assert stats.dimensions["model"].counts == [len(example_data)]
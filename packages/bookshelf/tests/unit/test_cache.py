@@ -0,0 +1,151 @@
+import os
+
+import pytest
+
+from bookshelf.book import LocalBook
+from bookshelf.cache import CacheManager, main
+from bookshelf.utils import file_lock, get_lock_fname
+
+
+def _create_book(local_bookshelf, version, data, accessed):
+    book = LocalBook.create_new("test", version, local_bookshelf=local_bookshelf)
+    book.add_timeseries("test", data)
+    for fname in book.files():
+        os.utime(fname, (accessed, os.stat(fname).st_mtime))
+    return book.long_version()
+
+
+@pytest.fixture()
+def manager(local_bookshelf, example_data):
+    _create_book(local_bookshelf, "v1.0.0", example_data, accessed=1000)
+    _create_book(local_bookshelf, "v2.0.0", example_data, accessed=3000)
+    _create_book(local_bookshelf, "v3.0.0", example_data, accessed=2000)
+
+    return CacheManager(local_bookshelf)
+
+
+def test_books(manager):
+    books = manager.books()
+
+    assert [b.long_version for b in books] == ["v1.0.0_e001", "v3.0.0_e001", "v2.0.0_e001"]
+    assert books[0].name == "test"
+    assert books[0].last_access == 1000
+    assert len(books[0].files) == 3
+    assert books[0].size == sum(os.path.getsize(f.path) for f in books[0].files)
+
+
+def test_stats(manager, monkeypatch):
+    stats = manager.stats()
+    assert stats.size == sum(b.size for b in stats.books)
+    assert stats.max_size is None
+    assert len(stats.books) == 3
+
+    monkeypatch.setenv("BOOKSHELF_CACHE_MAX_SIZE", "1000")
+    assert CacheManager(manager.path).stats().max_size == 1000
+
+
+def test_prune(manager):
+    book_size = manager.books()[0].size
+
+    removed = manager.prune(max_size=book_size * 2)
+    assert [b.long_version for b in removed] == ["v1.0.0_e001"]
+    assert [b.long_version for b in manager.books()] == ["v3.0.0_e001", "v2.0.0_e001"]
+
+    assert manager.prune(max_size=book_size * 2) == []
+
+
+def test_prune_no_quota(manager):
+    with pytest.raises(ValueError, match="No cache quota configured"):
+        manager.prune()
+
+
+def test_prune_skips_open(manager):
+    book = LocalBook("test", "v1.0.0", local_bookshelf=manager.path)
+
+    removed = manager.prune(max_size=0)
+    assert [b.long_version for b in removed] == ["v3.0.0_e001", "v2.0.0_e001"]
+    assert [b.long_version for b in manager.books()] == [book.long_version()]
+
+
+def test_prune_skips_fetching(manager):
+    # Another process is fetching a file of the least recently used book
+    fetching = manager.books()[0]
+    with file_lock(get_lock_fname(fetching.files[0].path)):
+        removed = manager.prune(max_size=0)
+
+    assert [b.long_version for b in removed] == ["v3.0.0_e001", "v2.0.0_e001"]
+    assert [b.long_version for b in manager.books()] == [fetching.long_version]
+
+    removed = manager.prune(max_size=0)
+    assert [b.long_version for b in removed] == [fetching.long_version]
+    assert not fetching.path.exists()
+
+
+def test_access_updates_lru(manager):
+    book = LocalBook("test", "v1.0.0", local_bookshelf=manager.path)
+    book.timeseries("test")
+    del book
+
+    assert manager.books()[-1].long_version == "v1.0.0_e001"
+
+
+def test_verify(manager):
+    assert manager.verify() == []
+
+    book = manager.books()[0]
+    fname = book.path / "test_v1.0.0_e001_test_wide.csv.gz"
+    with open(fname, "ab") as file_handle:
+        file_handle.write(b"corrupted")
+
+    assert manager.verify() == [fname]
+    assert fname.exists()
+    # Files of open books or files being fetched are not removed
+    open_book = LocalBook("test", "v1.0.0", local_bookshelf=manager.path)
+    assert manager.verify(remove=True) == [fname]
+    assert fname.exists()
+    del open_book
+    with file_lock(get_lock_fname(fname)):
+        assert manager.verify(remove=True) == [fname]
+    assert fname.exists()
+
+    assert manager.verify(remove=True) == [fname]
+    assert not fname.exists()
+    assert manager.verify() == []
+
+
+def test_main(manager, monkeypatch, capsys):
+    def run(*args):
+        monkeypatch.setattr("sys.argv", ["bookshelf.cache", "--path", str(manager.path), *args])
+        main()
+        return capsys.readouterr().out.splitlines()
+
+    book_size = manager.books()[0].size
+
+    out = run("stats")
+    assert out[0] == f"{manager.path}: {manager.size()} bytes in 3 books"
+    assert [line.split("\t")[0] for line in out[1:]] == [
+        "test@v1.0.0_e001",
+        "test@v3.0.0_e001",
+        "test@v2.0.0_e001",
+    ]
+
+    out = run("prune", "--max-size", str(book_size * 2))
+    assert [line.split("\t")[0] for line in out] == ["Removed test@v1.0.0_e001"]
+
+    assert run("verify") == []
+    fname = manager.books()[0].path / "test_v3.0.0_e001_test_wide.csv.gz"
+    with open(fname, "ab") as file_handle:
+        file_handle.write(b"corrupted")
+    with pytest.raises(SystemExit) as exc_info:
+        run("verify", "--remove")
+    assert exc_info.value.code == 1
+    assert capsys.readouterr().out.splitlines() == [f"Removed {fname}"]
+    assert not fname.exists()
+
+
+def test_main_prune_no_quota(manager, monkeypatch):
+    monkeypatch.setattr("sys.argv", ["bookshelf.cache", "--path", str(manager.path), "prune"])
+
+    with pytest.raises(SystemExit) as exc_info:
+        main()
+    assert exc_info.value.code == 2
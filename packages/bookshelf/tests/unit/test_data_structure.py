@@ -1,11 +1,16 @@
+import numpy as np
 import pandas as pd
 import pytest
 from scmdata import ScmRun
 from scmdata.testing import get_single_ts
 
+from bookshelf.book import LocalBook
 from bookshelf.dataset_structure import (
+    Violation,
     get_dataset_dictionary,
+    print_book_structure,
     print_dataset_structure,
+    verify_book,
     verify_data_dictionary,
 )
 from bookshelf.schema import NotebookMetadata
@@ -395,3 +400,207 @@ def test_verify_data_dictionary_non_na_col_match():
     verification = verify_data_dictionary(data, config)
 
     assert not verification.non_na_col_match
+
+
+def test_verify_data_dictionary_controlled_vocabulary_na():
+    # Missing values are never in the CV, even if missing values are allowed
+    data = ScmRun(
+        np.arange(4.0).reshape(2, 2),
+        index=[2020, 2030],
+        columns={
+            "model": "a",
+            "region": ["World", np.nan],
+            "scenario": "historical",
+            "variable": "Emissions|CO2",
+            "unit": "Mt CO2/yr",
+        },
+    )
+
+    config = NotebookMetadata(
+        name="test",
+        version="v1.0.0",
+        edition=1,
+        license="unspecified",
+        source_file="",
+        private=False,
+        metadata={},
+        dataset={
+            "author": "test",
+            "files": [],
+        },
+        data_dictionary=[
+            {
+                "name": "region",
+                "description": "Area that the results are valid for",
+                "type": "string",
+                "allowed_NA": True,
+                "required_column": True,
+                "controlled_vocabulary": [
+                    {"value": "World", "description": "Aggregate results for the world"},
+                ],
+            },
+        ],
+    )
+
+    verification = verify_data_dictionary(data, config)
+
+    assert verification.violations == [
+        Violation(dimension="region", check="controlled_vocabulary_match", values=(None,), row_count=1),
+    ]
+    assert not verification.controlled_vocabulary_match
+    assert verification.non_na_col_match
+
+
+@pytest.fixture
+def invalid_data():
+    return ScmRun(
+        np.arange(8.0).reshape(2, 4),
+        index=[2020, 2030],
+        columns={
+            "model": ["a", "b", "c", "d"],
+            "region": ["World", "AUS", "AUS", "NZL"],
+            "scenario": "historical",
+            "variable": "Emissions|CO2",
+            "unit": "Mt CO2/yr",
+            "category": ["1", "2", "x", np.nan],
+        },
+    )
+
+
+@pytest.fixture
+def invalid_data_config():
+    # Data dictionary which `invalid_data` violates
+    return NotebookMetadata(
+        name="test",
+        version="v1.0.0",
+        edition=1,
+        license="unspecified",
+        source_file="",
+        private=False,
+        metadata={},
+        dataset={
+            "author": "test",
+            "files": [],
+        },
+        data_dictionary=[
+            {
+                "name": "region",
+                "description": "Area that the results are valid for",
+                "type": "string",
+                "allowed_NA": False,
+                "required_column": True,
+                "controlled_vocabulary": [
+                    {"value": "World", "description": "Aggregate results for the world"},
+                    {"value": "NZL", "description": "New Zealand"},
+                ],
+            },
+            {
+                "name": "category",
+                "description": "Category",
+                "type": "float",
+                "allowed_NA": False,
+                "required_column": True,
+            },
+            {
+                "name": "source",
+                "description": "Name of the dataset",
+                "type": "string",
+                "allowed_NA": False,
+                "required_column": True,
+            },
+        ],
+    )
+
+
+def test_verify_data_dictionary_violations(invalid_data, invalid_data_config):
+    verification = verify_data_dictionary(invalid_data, invalid_data_config)
+
+    assert verification.violations == [
+        Violation(dimension="region", check="controlled_vocabulary_match", values=("AUS",), row_count=2),
+        Violation(dimension="category", check="col_type_match", values=("x",), row_count=1),
+        Violation(dimension="category", check="non_na_col_match", values=(None,), row_count=1),
+        Violation(dimension="source", check="column_match"),
+    ]
+    assert not verification.column_match
+    assert not verification.col_type_match
+    assert not verification.controlled_vocabulary_match
+    assert not verification.non_na_col_match
+    assert verification.error_message() == "Data dictionary does not match the data: column_match is not true"
+
+
+def test_verify_book(invalid_data, invalid_data_config, local_bookshelf):
+    book = LocalBook.create_new("test", "v1.0.0", local_bookshelf=local_bookshelf)
+    book.add_timeseries("test", invalid_data)
+
+    verification = verify_book(book, "test", invalid_data_config, chunksize=1)
+
+    assert verification.violations == verify_data_dictionary(invalid_data, invalid_data_config).violations
+
+    with pytest.raises(ValueError, match="Unknown timeseries 'other_wide'"):
+        verify_book(book, "other", invalid_data_config)
+
+
+def test_print_book_structure(sample_scmrun, local_bookshelf, capsys, mocker):
+    book = LocalBook.create_new("test", "v1.0.0", local_bookshelf=local_bookshelf)
+    book.add_timeseries("test", sample_scmrun)
+    expected_output = (
+        "model (3)     region (1)      scenario (1)     unit (1)        variable (1)     \n"
+        "---------     -----------     ------------     -----------     ------------     \n"
+        "model1        unspecified     rcp26            unspecified     unspecified      \n"
+        "model2                                                                          \n"
+        "model3                                                                          \n"
+    )
+
+    # The structure is read from the metadata without loading the data
+    mocker.patch.object(LocalBook, "timeseries", side_effect=AssertionError)
+    print_book_structure(book, "test")
+    assert capsys.readouterr().out.strip() == expected_output.strip()
+
+    # Books without statistics load the data instead
+    mocker.patch.object(LocalBook, "resource_statistics", return_value=None)
+    mocker.patch.object(LocalBook, "timeseries", return_value=sample_scmrun)
+    print_book_structure(book, "test")
+    assert capsys.readouterr().out.strip() == expected_output.strip()
+
+
+def test_print_book_structure_non_string(local_bookshelf, capsys):
+    data = ScmRun(
+        np.arange(6.0).reshape(2, 3),
+        index=[2020, 2030],
+        columns={
+            "model": "a",
+            "region": "World",
+            "scenario": "historical",
+            "variable": "Emissions|CO2",
+            "unit": "Mt CO2/yr",
+            "flag": [True, False, True],
+            "run_id": [3, 1, 2],
+        },
+    )
+    book = LocalBook.create_new("test", "v1.0.0", local_bookshelf=local_bookshelf)
+    book.add_timeseries("test", data)
+
+    print_dataset_structure(book.timeseries("test"))
+    dataset_lines = capsys.readouterr().out.splitlines()
+    print_book_structure(book, "test")
+    book_lines = capsys.readouterr().out.splitlines()
+
+    # Only the header differs as it includes the cardinality of each dimension
+    assert book_lines[0].split() == [
+        "flag",
+        "(2)",
+        "model",
+        "(1)",
+        "region",
+        "(1)",
+        "run_id",
+        "(3)",
+        "scenario",
+        "(1)",
+        "unit",
+        "(1)",
+        "variable",
+        "(1)",
+    ]
+    assert [line.split() for line in book_lines[2:]] == [line.split() for line in dataset_lines[2:]]
+    assert book_lines[2].split()[0] == "False"
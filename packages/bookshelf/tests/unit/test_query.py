@@ -0,0 +1,79 @@
+import pytest
+
+from bookshelf.book import LocalBook
+from bookshelf.query import QueryEngine, get_table_name
+
+
+@pytest.fixture()
+def engine():
+    with QueryEngine() as engine:
+        yield engine
+
+
+@pytest.fixture()
+def book(example_data):
+    book = LocalBook.create_new("test-book", "v1.1.0")
+    book.add_timeseries("leakage_rates", example_data)
+    return book
+
+
+def test_get_table_name():
+    assert get_table_name("un-wpp", "by country") == "un_wpp_by_country"
+
+
+def test_add_resource(engine, book, example_long_format_data, monkeypatch):
+    monkeypatch.setattr("bookshelf.query.INGEST_CHUNK_SIZE", 10)
+
+    table = engine.add_resource(book, "leakage_rates")
+    assert table == "test_book_leakage_rates"
+    assert engine.tables() == [table]
+
+    result = engine.sql("SELECT * FROM test_book_leakage_rates")
+    assert len(result) == len(example_long_format_data)
+    assert "value" in result.columns
+    assert result["year"].unique().tolist() == [2020]
+
+    # Reloading replaces the existing table
+    engine.add_resource(book, "leakage_rates")
+    assert len(engine.sql("SELECT * FROM test_book_leakage_rates")) == len(example_long_format_data)
+
+
+def test_add_book(engine, book, example_data):
+    book.add_timeseries("wide_only", example_data, write_long=False)
+
+    assert engine.add_book(book) == ["test_book_leakage_rates"]
+    with pytest.raises(ValueError, match="Unknown timeseries 'wide_only_long'"):
+        engine.add_resource(book, "wide_only")
+
+
+def test_sql(engine, book, example_long_format_data):
+    engine.add_resource(book, "leakage_rates", table_name="a")
+    engine.add_resource(book, "leakage_rates", table_name="b")
+
+    result = engine.sql(
+        "SELECT a.variable, a.year, a.value + b.value AS total "
+        "FROM (SELECT variable, year, SUM(value) AS value FROM a GROUP BY variable, year) AS a "
+        "JOIN (SELECT variable, year, SUM(value) AS value FROM b GROUP BY variable, year) AS b "
+        "USING (variable, year) WHERE a.year = ?",
+        params=(2020,),
+    )
+    exp = example_long_format_data.groupby("variable")["values"].sum()
+    assert len(result) == len(exp)
+    assert result.set_index("variable")["total"].to_dict() == pytest.approx((2 * exp).to_dict())
+
+    chunks = list(engine.sql("SELECT * FROM a", chunksize=10))
+    assert sum(len(c) for c in chunks) == len(example_long_format_data)
+
+
+def test_database(book, tmp_path):
+    with QueryEngine() as engine:
+        engine.add_resource(book, "leakage_rates")
+        database = engine.database
+        assert database.exists()
+    # The temporary database is removed
+    assert not database.exists()
+
+    with QueryEngine(tmp_path / "query.sqlite") as engine:
+        engine.add_resource(book, "leakage_rates")
+    with QueryEngine(tmp_path / "query.sqlite") as engine:
+        assert engine.tables() == ["test_book_leakage_rates"]
@@ -1,10 +1,12 @@
+import concurrent.futures
 import os
 
+import pooch
 import pytest
 from pydantic import ValidationError
 
-from bookshelf.schema import DatasetMetadata, NotebookMetadata
-from bookshelf.utils import get_notebook_directory
+from bookshelf.schema import DatasetMetadata, NotebookMetadata, VolumeIndex, VolumeMeta, version_sort_key
+from bookshelf.utils import DOWNLOAD_MAX_WORKERS, get_notebook_directory
 
 
 @pytest.fixture
@@ -128,9 +130,6 @@ def test_notebook_metadata_invalid_data_dictionary():
 
 @pytest.mark.parametrize("idx", (None, 0, -1))
 def test_download_files(idx, notebook_metadata):
-    # doesn't trigger pooch.retrieve
-    # TODO: add tests for pooch functionality
-
     if idx:
         res = notebook_metadata.download_file(idx)
     else:
@@ -143,3 +142,128 @@ def test_download_files(idx, notebook_metadata):
 def test_download_files_with_invalid_idx(idx, notebook_metadata):
     with pytest.raises(ValueError, match="Requested index does not exist"):
         notebook_metadata.download_file(idx)
+
+
+@pytest.fixture
+def volume_meta():
+    versions = [
+        ("v9", 1, False),
+        ("v10", 1, False),
+        ("v10", 3, False),
+        ("v10", 2, False),
+        ("v2", 1, False),
+        ("v11", 1, True),
+    ]
+    return VolumeMeta(
+        name="test",
+        license="MIT",
+        versions=[
+            {"version": version, "edition": edition, "url": "", "hash": "", "private": private}
+            for version, edition, private in versions
+        ],
+    )
+
+
+@pytest.mark.parametrize(
+    "versions,exp",
+    (
+        (["v10", "v9", "v1"], ["v1", "v9", "v10"]),
+        (
+            ["v1.10.0", "v1.2.0", "v1.2.0.1", "v1.2.0rc1", "v1.2.0a1"],
+            ["v1.2.0a1", "v1.2.0rc1", "v1.2.0", "v1.2.0.1", "v1.10.0"],
+        ),
+        (["v2023.10", "v2023.9", "v2022.12"], ["v2022.12", "v2023.9", "v2023.10"]),
+        (["AR6", "AR5"], ["AR5", "AR6"]),
+    ),
+)
+def test_version_sort_key(versions, exp):
+    assert sorted(versions, key=version_sort_key) == exp
+
+
+def test_volume_meta_latest_version(volume_meta):
+    assert volume_meta.get_latest_version() == "v10"
+    assert [v.edition for v in volume_meta.get_version("v10")] == [1, 2, 3]
+
+
+def test_volume_index(volume_meta):
+    index = VolumeIndex(volume_meta)
+
+    assert index.get_latest_version() == "v10"
+    assert [v.edition for v in index.get_version("v10")] == [1, 2, 3]
+    assert [v.edition for v in index.get_version("v11")] == [1]
+    assert index.get_version("missing") == []
+    assert index.list_versions() == ["v9", "v10", "v10", "v10", "v2"]
+
+
+def test_volume_index_no_published():
+    index = VolumeIndex(VolumeMeta(name="test", license="MIT", versions=[]))
+
+    with pytest.raises(ValueError, match="No published volumes"):
+        index.get_latest_version()
+
+
+def _notebook_metadata_with_files(version, files):
+    return NotebookMetadata(
+        name="test",
+        version=version,
+        edition=1,
+        license="unspecified",
+        source_file="",
+        private=False,
+        metadata={},
+        dataset={"author": "test", "files": files},
+    )
+
+
+def test_download_files_remote(requests_mock, monkeypatch, tmp_path, sha256):
+    monkeypatch.setenv("BOOKSHELF_DOWNLOAD_CACHE_LOCATION", str(tmp_path))
+    requests_mock.get("https://example.com/v1/a.csv", content=b"a")
+    requests_mock.get("https://example.com/v1/b.csv", content=b"b")
+    requests_mock.get("https://example.com/v2/a.csv", content=b"a")
+
+    meta = _notebook_metadata_with_files(
+        "v1.0.0",
+        [
+            {"url": "https://example.com/v1/a.csv", "hash": sha256(b"a")},
+            {"url": "https://example.com/v1/b.csv", "hash": ""},
+            {"url": "file://local/filename.txt", "hash": ""},
+        ],
+    )
+    res = meta.download_files()
+
+    assert res[0] == str(tmp_path / "by-hash" / f"sha256-{sha256(b'a')}" / "a.csv")
+    assert res[1] == str(tmp_path / pooch.utils.unique_file_name("https://example.com/v1/b.csv"))
+    assert res[2] == os.path.join(get_notebook_directory(), "local/filename.txt")
+    assert [open(fname, "rb").read() for fname in res[:2]] == [b"a", b"b"]
+    assert requests_mock.call_count == 2
+
+    # Files with the same hash are reused by other versions
+    new_meta = _notebook_metadata_with_files(
+        "v2.0.0", [{"url": "https://example.com/v2/a.csv", "hash": sha256(b"a")}]
+    )
+    assert new_meta.download_files() == res[:1]
+    assert new_meta.download_file() == res[0]
+    assert requests_mock.call_count == 2
+
+
+def test_download_files_max_workers(mocker):
+    executor = mocker.spy(concurrent.futures, "ThreadPoolExecutor")
+    files = [{"url": f"file://local/{idx}.txt", "hash": ""} for idx in range(10)]
+    meta = _notebook_metadata_with_files("v1.0.0", files)
+
+    assert len(meta.download_files()) == len(files)
+    assert executor.call_args.kwargs["max_workers"] == DOWNLOAD_MAX_WORKERS
+
+    meta.download_files(max_workers=20)
+    assert executor.call_args.kwargs["max_workers"] == len(files)
+
+
+def test_download_files_hash_mismatch(requests_mock, monkeypatch, tmp_path, sha256):
+    monkeypatch.setenv("BOOKSHELF_DOWNLOAD_CACHE_LOCATION", str(tmp_path))
+    requests_mock.get("https://example.com/a.csv", content=b"other")
+
+    meta = _notebook_metadata_with_files(
+        "v1.0.0", [{"url": "https://example.com/a.csv", "hash": sha256(b"a")}]
+    )
+    with pytest.raises(ValueError, match="SHA256 hash of downloaded file"):
+        meta.download_files()
@@ -0,0 +1,185 @@
+import contextlib
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from bookshelf import BookShelf, LocalBook
+from bookshelf.server import _parse_range, create_server
+
+
+@pytest.fixture()
+def server(local_bookshelf, example_data):
+    book = LocalBook.create_new("test", "v1.1.0", local_bookshelf=local_bookshelf)
+    book.add_timeseries("test", example_data)
+    with open(local_bookshelf / "test" / "volume.json", "w") as file_handle:
+        file_handle.write(
+            '{"name": "test", "license": "", "versions": ['
+            '{"version": "v1.1.0", "edition": 1, "url": "", "hash": "", "private": false}]}'
+        )
+
+    with _run_server(local_bookshelf, book) as running:
+        yield running
+
+
+@contextlib.contextmanager
+def _run_server(path, book, **kwargs):
+    server = create_server(path, port=0, **kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    try:
+        yield f"http://{host}:{port}", book
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _request(url, **headers):
+    req = urllib.request.Request(url, headers=headers)  # noqa: S310
+    try:
+        with urllib.request.urlopen(req) as resp:  # noqa: S310
+            return resp.status, resp.headers, resp.read()
+    except urllib.error.HTTPError as error:
+        return error.code, error.headers, error.read()
+
+
+@pytest.mark.parametrize(
+    "value,exp",
+    (
+        ("bytes=0-9", (0, 9)),
+        ("bytes=10-", (10, 99)),
+        ("bytes=-10", (90, 99)),
+        ("bytes=90-200", (90, 99)),
+        ("bytes=100-", None),
+        ("bytes=10-5", None),
+        ("bytes=-", None),
+        ("bytes=0-1,5-6", None),
+    ),
+)
+def test_parse_range(value, exp):
+    assert _parse_range(value, 100) == exp
+
+
+def test_serve_file(server):
+    url, book = server
+    fname = f"test_{book.long_version()}_test_wide.csv.gz"
+    path = f"{url}/test/{book.long_version()}/{fname}"
+    with open(book.local_fname(fname), "rb") as file_handle:
+        content = file_handle.read()
+
+    status, headers, body = _request(path)
+    assert status == 200
+    assert body == content
+    assert headers["Content-Type"] == "application/gzip"
+    assert "Content-Encoding" not in headers
+    assert headers["Accept-Ranges"] == "bytes"
+
+    status, headers, body = _request(path, Range="bytes=10-19")
+    assert status == 206
+    assert body == content[10:20]
+    assert headers["Content-Range"] == f"bytes 10-19/{len(content)}"
+
+    status, _, _ = _request(path, Range=f"bytes={len(content)}-")
+    assert status == 416
+
+
+def test_serve_etag(server):
+    url, book = server
+    path = f"{url}/test/{book.long_version()}/datapackage.json"
+
+    status, headers, _ = _request(path)
+    etag = headers["ETag"]
+    assert status == 200
+
+    status, _, body = _request(path, **{"If-None-Match": etag})
+    assert status == 304
+    assert body == b""
+
+    # A stale If-Range returns the full file
+    status, _, body = _request(path, Range="bytes=0-0", **{"If-Range": '"stale"'})
+    assert status == 200
+    assert len(body) > 1
+
+
+@pytest.mark.parametrize("path", ["test", "test/.volume.json.lock", "missing.json"])
+def test_serve_not_found(server, path):
+    url, _ = server
+
+    status, _, _ = _request(f"{url}/{path}")
+    assert status == 404
+
+
+def test_serve_from_hidden_directory(tmp_path, example_data):
+    # The default local bookshelf is in ~/.cache
+    local_bookshelf = tmp_path / ".cache" / "bookshelf"
+    book = LocalBook.create_new("test", "v1.1.0", local_bookshelf=local_bookshelf)
+    book.add_timeseries("test", example_data)
+
+    with _run_server(local_bookshelf, book) as (url, _):
+        status, _, _ = _request(f"{url}/test/{book.long_version()}/datapackage.json")
+        assert status == 200
+
+        status, _, _ = _request(f"{url}/test/.hidden")
+        assert status == 404
+
+
+def test_serve_as_remote(server, requests_mock, tmp_path):
+    url, book = server
+    requests_mock.real_http = True
+
+    shelf = BookShelf(path=tmp_path, remote_bookshelf=url)
+    new_book = shelf.load("test")
+
+    assert new_book.long_version() == book.long_version()
+    assert len(new_book.timeseries("test")) == len(book.timeseries("test"))
+
+
+def test_serve_volume_no_cache(server):
+    url, book = server
+
+    status, headers, _ = _request(f"{url}/test/volume.json")
+    assert status == 200
+    assert headers["Cache-Control"] == "no-cache"
+
+    status, headers, _ = _request(f"{url}/test/{book.long_version()}/datapackage.json")
+    assert status == 200
+    assert "Cache-Control" not in headers
+
+
+def test_serve_volume_from_upstream(local_bookshelf, example_data, requests_mock):
+    book = LocalBook.create_new("test", "v1.1.0", local_bookshelf=local_bookshelf)
+    book.add_timeseries("test", example_data)
+    volume = {
+        "name": "test",
+        "license": "",
+        "versions": [
+            {"version": "v1.1.0", "edition": 1, "url": "", "hash": "", "private": False},
+            {"version": "v1.2.0", "edition": 1, "url": "", "hash": "", "private": False},
+        ],
+    }
+    requests_mock.real_http = True
+    requests_mock.get("https://upstream.test/test/volume.json", json=volume)
+
+    with _run_server(local_bookshelf, book, upstream="https://upstream.test") as (url, _):
+        status, _, body = _request(f"{url}/test/volume.json")
+
+    assert status == 200
+    assert json.loads(body) == volume
+    assert json.loads((local_bookshelf / "test" / "volume.json").read_text()) == volume
+
+
+def test_serve_volume_upstream_unavailable(server, local_bookshelf, requests_mock, mocker):
+    mocker.patch("bookshelf.utils.time.sleep")
+    _, book = server
+    cached = (local_bookshelf / "test" / "volume.json").read_bytes()
+    requests_mock.real_http = True
+    requests_mock.get("https://upstream.test/test/volume.json", status_code=503)
+
+    with _run_server(local_bookshelf, book, upstream="https://upstream.test") as (url, _):
+        status, _, body = _request(f"{url}/test/volume.json")
+
+    assert status == 200
+    assert body == cached
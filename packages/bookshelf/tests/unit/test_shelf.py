@@ -1,15 +1,18 @@
 import io
 import json
+import os
 import pathlib
 import platform
 import re
 
 import platformdirs
 import pytest
+import requests
+import scmdata.testing
 
 from bookshelf.constants import DATA_FORMAT_VERSION
 from bookshelf.errors import UnknownBook, UnknownVersion
-from bookshelf.shelf import BookShelf, LocalBook
+from bookshelf.shelf import BookShelf, LocalBook, _build_volume_index
 
 
 @pytest.fixture()
@@ -91,6 +94,28 @@ def test_load_with_cached(remote_bookshelf, local_bookshelf):
     assert remote_bookshelf.mocker.call_count == 4
 
 
+def test_load_latest_version_ordering(shelf, remote_bookshelf):
+    remote_bookshelf.register("test", "v10.0.0", 1)
+    remote_bookshelf.register("test", "v9.0.0", 1)
+
+    assert shelf.load("test").version == "v10.0.0"
+
+
+def test_volume_index_memoised(shelf, remote_bookshelf):
+    remote_bookshelf.register("test", "v1.2.3", 1)
+    _build_volume_index.cache_clear()
+
+    assert shelf.is_available("test", "v1.0.0")
+    assert shelf.is_available("test", "v1.1.0")
+    assert shelf.load("test").version == "v1.2.3"
+    assert _build_volume_index.cache_info().misses == 1
+    assert _build_volume_index.cache_info().hits == 2
+
+    remote_bookshelf.register("test", "v1.2.4", 1)
+    assert shelf.load("test").version == "v1.2.4"
+    assert _build_volume_index.cache_info().misses == 2
+
+
 def test_is_available(shelf, remote_bookshelf):
     remote_bookshelf.mocker.get(f"/{DATA_FORMAT_VERSION}/other/volume.json", status_code=404)
 
@@ -137,3 +162,177 @@ def test_private_list(remote_bookshelf, local_bookshelf):
     assert shelf.load("test", "v2_private")
 
     assert shelf.load("test").version == "v1.1.0"
+
+
+def test_shared_bookshelf(remote_bookshelf, tmp_path):
+    shared = tmp_path / "shared"
+    node_a = BookShelf(path=tmp_path / "node_a", shared_bookshelves=[shared])
+    node_a.load("test", "v1.0.0", 1).timeseries("leakage_rates_low")
+    call_count = remote_bookshelf.mocker.call_count
+
+    edition_dir = shared / "test" / "v1.0.0_e001"
+    assert sorted(f.name for f in edition_dir.iterdir()) == [
+        "datapackage.json",
+        "test_v1.0.0_e001_leakage_rates_low_wide.csv",
+    ]
+
+    # A different node is filled from the shared bookshelf without hitting the remote
+    node_b = BookShelf(path=tmp_path / "node_b", shared_bookshelves=[shared])
+    node_b.load("test", "v1.0.0", 1).timeseries("leakage_rates_low")
+    assert remote_bookshelf.mocker.call_count == call_count
+    assert (tmp_path / "node_b" / "test" / "v1.0.0_e001" / "datapackage.json").exists()
+
+
+def test_shared_bookshelf_promotion(remote_bookshelf, tmp_path):
+    fast = tmp_path / "fast"
+    slow = tmp_path / "slow"
+    BookShelf(path=tmp_path / "node_a", shared_bookshelves=[slow]).load("test", "v1.0.0", 1)
+    call_count = remote_bookshelf.mocker.call_count
+
+    BookShelf(path=tmp_path / "node_b", shared_bookshelves=[fast, slow]).load("test", "v1.0.0", 1)
+    assert remote_bookshelf.mocker.call_count == call_count
+    assert (fast / "test" / "v1.0.0_e001" / "datapackage.json").exists()
+
+
+def test_shared_bookshelf_env(monkeypatch, tmp_path):
+    monkeypatch.setenv(
+        "BOOKSHELF_SHARED_CACHE_LOCATION", os.pathsep.join([str(tmp_path / "a"), str(tmp_path / "b")])
+    )
+
+    shelf = BookShelf(path=tmp_path / "local")
+    assert shelf.shared_bookshelves == [
+        tmp_path / "a" / DATA_FORMAT_VERSION,
+        tmp_path / "b" / DATA_FORMAT_VERSION,
+    ]
+    assert BookShelf(path=tmp_path / "local", shared_bookshelves=[]).shared_bookshelves == []
+
+
+@pytest.fixture()
+def mirror(remote_bookshelf, monkeypatch, mocker):
+    monkeypatch.setattr("bookshelf.utils._REMOTE_LATENCY", {})
+    mocker.patch("bookshelf.utils.time.sleep")
+    # The mirror is preferred, but all requests to it fail
+    mocker.patch(
+        "bookshelf.utils._measure_latency",
+        side_effect=lambda bookshelf: 0.1 if "mirror" in bookshelf else 0.5,
+    )
+    url = f"https://mirror.local/{DATA_FORMAT_VERSION}"
+    remote_bookshelf.mocker.get(re.compile("https://mirror.local/.*"), exc=requests.exceptions.ConnectTimeout)
+    return url
+
+
+def test_mirror_fallback(mirror, local_bookshelf, example_data):
+    remote = f"https://bookshelf.local/{DATA_FORMAT_VERSION}"
+    shelf = BookShelf(path=local_bookshelf, remote_bookshelf=[remote, mirror])
+    assert shelf.remote_bookshelf == remote
+    assert shelf._ranked_remote_bookshelves() == [mirror, remote]
+
+    book = shelf.load("test", "v1.0.0")
+    scmdata.testing.assert_scmdf_almost_equal(example_data, book.timeseries("leakage_rates_low"))
+
+    # The failing mirror is demoted
+    assert shelf._ranked_remote_bookshelves() == [remote, mirror]
+    assert book.bookshelves == [remote, mirror]
+
+
+def test_mirror_failure_expires(mirror, local_bookshelf, monkeypatch):
+    remote = f"https://bookshelf.local/{DATA_FORMAT_VERSION}"
+    shelf = BookShelf(path=local_bookshelf, remote_bookshelf=[remote, mirror])
+    shelf.load("test", "v1.0.0")
+    assert shelf._ranked_remote_bookshelves() == [remote, mirror]
+
+    # Once the failure has expired the mirror is probed again and is preferred
+    monkeypatch.setattr("bookshelf.utils.REMOTE_FAILURE_TTL", 0)
+    assert shelf._ranked_remote_bookshelves() == [mirror, remote]
+
+
+def test_mirror_missing_book(mirror, local_bookshelf, remote_bookshelf):
+    remote_bookshelf.mocker.get(f"/{DATA_FORMAT_VERSION}/missing/volume.json", status_code=404)
+    shelf = BookShelf(
+        path=local_bookshelf, remote_bookshelf=[mirror, f"https://bookshelf.local/{DATA_FORMAT_VERSION}"]
+    )
+
+    with pytest.raises(UnknownBook):
+        shelf.load("missing")
+
+
+def test_mirror_missing_book_unavailable_mirror(mirror, local_bookshelf, remote_bookshelf, mocker):
+    # The healthy remote is tried first and reports the book as missing
+    mocker.patch(
+        "bookshelf.utils._measure_latency",
+        side_effect=lambda bookshelf: 0.5 if "mirror" in bookshelf else 0.1,
+    )
+    remote = f"https://bookshelf.local/{DATA_FORMAT_VERSION}"
+    remote_bookshelf.mocker.get(f"{remote}/missing/volume.json", status_code=404)
+    shelf = BookShelf(path=local_bookshelf, remote_bookshelf=[remote, mirror])
+    assert shelf._ranked_remote_bookshelves() == [remote, mirror]
+
+    with pytest.raises(UnknownBook):
+        shelf.load("missing")
+
+
+def test_mirror_invalid_segments(mirror, local_bookshelf, monkeypatch):
+    monkeypatch.setenv("BOOKSHELF_DOWNLOAD_SEGMENTS", "many")
+    remote = f"https://bookshelf.local/{DATA_FORMAT_VERSION}"
+    shelf = BookShelf(path=local_bookshelf, remote_bookshelf=[remote, mirror])
+    assert shelf._ranked_remote_bookshelves() == [mirror, remote]
+
+    with pytest.raises(ValueError, match="invalid literal"):
+        shelf.load("test", "v1.0.0")
+    # An invalid setting isn't a failure of the remotes
+    assert shelf._ranked_remote_bookshelves() == [mirror, remote]
+
+
+def test_mirror_env(monkeypatch, local_bookshelf):
+    monkeypatch.setenv("BOOKSHELF_REMOTE", "https://a.local https://b.local")
+
+    shelf = BookShelf(path=local_bookshelf)
+    assert shelf.remote_bookshelves == ["https://a.local", "https://b.local"]
+    assert shelf.remote_bookshelf == "https://a.local"
+
+
+@pytest.fixture()
+def file_remote(tmp_path, example_data):
+    path = tmp_path / "remote"
+    book = LocalBook.create_new("test", "v1.0.0", local_bookshelf=path)
+    book.add_timeseries("leakage_rates_low", example_data)
+    with open(path / "test" / "volume.json", "w") as file_handle:
+        json.dump(
+            {
+                "name": "test",
+                "license": "MIT",
+                "versions": [{"version": "v1.0.0", "edition": 1, "url": "", "hash": "", "private": False}],
+            },
+            file_handle,
+        )
+    return path
+
+
+def test_file_remote(file_remote, local_bookshelf, example_data, requests_mock):
+    shelf = BookShelf(path=local_bookshelf, remote_bookshelf=file_remote.as_uri())
+
+    book = shelf.load("test")
+    scmdata.testing.assert_scmdf_almost_equal(example_data, book.timeseries("leakage_rates_low"))
+    assert requests_mock.call_count == 0
+
+    # Resources with a known hash are hardlinked while metadata is copied
+    fname = pathlib.Path("test", "v1.0.0_e001", "test_v1.0.0_e001_leakage_rates_low_wide.csv.gz")
+    assert (local_bookshelf / fname).samefile(file_remote / fname)
+    assert not (local_bookshelf / "test" / "volume.json").samefile(file_remote / "test" / "volume.json")
+
+
+def test_file_remote_missing(file_remote, local_bookshelf):
+    shelf = BookShelf(path=local_bookshelf, remote_bookshelf=file_remote.as_uri())
+
+    with pytest.raises(UnknownBook):
+        shelf.load("missing")
+    with pytest.raises(UnknownVersion):
+        shelf.load("test", "v2.0.0", 1)
+
+
+def test_file_remote_no_cache(file_remote, local_bookshelf, example_data):
+    shelf = BookShelf(path=local_bookshelf, remote_bookshelf=file_remote.as_uri())
+
+    book = shelf.load("test")
+    scmdata.testing.assert_scmdf_almost_equal(example_data, book.timeseries("leakage_rates_low", cache=False))
+    assert not os.path.exists(book.local_fname("test_v1.0.0_e001_leakage_rates_low_wide.csv.gz"))
@@ -1,7 +1,26 @@
+import hashlib
+import http.server
+import os
+import re
+import threading
+import time
+
 import pytest
+import requests
 
 from bookshelf.constants import DEFAULT_BOOKSHELF
-from bookshelf.utils import build_url, get_env_var, get_remote_bookshelf
+from bookshelf.utils import (
+    DOWNLOAD_CHUNK_SIZE,
+    build_url,
+    download,
+    fetch_file,
+    file_lock,
+    get_env_var,
+    get_lock_fname,
+    get_remote_bookshelf,
+    mark_accessed,
+    try_file_lock,
+)
 
 
 @pytest.mark.parametrize(
@@ -48,3 +67,262 @@ def test_get_env_var(monkeypatch):
     assert get_env_var("test") == exp_value
     assert get_env_var("TeST") == exp_value
     assert get_env_var("BOOKSHELF_test", add_prefix=False) == exp_value
+
+
+@pytest.fixture()
+def slow_download(mocker):
+    def _download(url, local_fname, known_hash=None, **kwargs):
+        time.sleep(0.1)
+        tmp_fname = local_fname.parent / "partial"
+        tmp_fname.write_text(url)
+        tmp_fname.replace(local_fname)
+
+    return mocker.patch("bookshelf.utils.download", side_effect=_download)
+
+
+def _fetch_concurrently(local_fname, force=False, n=4):
+    threads = [
+        threading.Thread(
+            target=fetch_file, args=("https://test.com/file.txt", local_fname), kwargs={"force": force}
+        )
+        for _ in range(n)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_fetch_file_concurrent(tmp_path, slow_download):
+    local_fname = tmp_path / "book" / "file.txt"
+
+    _fetch_concurrently(local_fname)
+
+    assert slow_download.call_count == 1
+    assert local_fname.read_text() == "https://test.com/file.txt"
+    assert get_lock_fname(local_fname).exists()
+
+
+def test_fetch_file_concurrent_force(tmp_path, slow_download):
+    local_fname = tmp_path / "file.txt"
+    local_fname.write_text("old")
+
+    _fetch_concurrently(local_fname, force=True)
+
+    assert slow_download.call_count == 1
+    assert local_fname.read_text() == "https://test.com/file.txt"
+
+
+def test_fetch_file_shared_tier(tmp_path, slow_download):
+    url = "https://test.com/file.txt"
+    known_hash = hashlib.sha256(url.encode()).hexdigest()
+    local_fname = tmp_path / "local" / "file.txt"
+    shared_fname = tmp_path / "shared" / "file.txt"
+    shared_fname.parent.mkdir()
+    shared_fname.write_text("corrupted")
+
+    # Files in a shared tier which don't match the hash are ignored
+    fetch_file(url, local_fname, known_hash=known_hash, shared_fnames=[shared_fname])
+    assert slow_download.call_count == 1
+    assert local_fname.read_text() == url
+    assert shared_fname.read_text() == "corrupted"
+
+    shared_fname.write_text(url)
+    local_fname.unlink()
+    fetch_file(url, local_fname, known_hash=known_hash, shared_fnames=[shared_fname])
+    assert slow_download.call_count == 1
+    assert local_fname.read_text() == url
+
+
+def test_try_file_lock(tmp_path):
+    lock_fname = tmp_path / ".file.txt.lock"
+
+    with try_file_lock(lock_fname) as locked:
+        assert locked
+    with file_lock(lock_fname), try_file_lock(lock_fname) as locked:
+        assert not locked
+    with try_file_lock(lock_fname) as locked:
+        assert locked
+
+
+def test_mark_accessed(tmp_path, monkeypatch):
+    fname = tmp_path / "file.txt"
+    fname.write_text("content")
+    os.utime(fname, (1000, 2000))
+
+    mark_accessed(fname)
+    assert fname.stat().st_atime > 1000
+    assert fname.stat().st_mtime == 2000
+
+    # Missing files and files owned by other users are ignored
+    mark_accessed(tmp_path / "missing.txt")
+
+    def raise_permission_error(*args, **kwargs):
+        raise PermissionError("Operation not permitted")
+
+    monkeypatch.setattr(os, "utime", raise_permission_error)
+    mark_accessed(fname)
+
+
+def test_fetch_file_existing_hash_mismatch(tmp_path, slow_download):
+    local_fname = tmp_path / "file.txt"
+    local_fname.write_text("old")
+
+    with pytest.raises(ValueError, match="does not match the expected value"):
+        fetch_file("https://test.com/file.txt", local_fname, known_hash="sha256:abc")
+    assert slow_download.call_count == 0
+
+
+class _RangeRequestHandler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        if self.server.head_status != 200:
+            self.send_error(self.server.head_status)
+            return
+        self.send_response(200)
+        if self.server.support_ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(len(self.server.content)))
+        self.send_header("ETag", '"abc"')
+        self.end_headers()
+
+    def do_GET(self):
+        content = self.server.content
+        start, end = 0, len(content) - 1
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        self.server.ranges.append(self.headers.get("Range"))
+        if match and self.server.support_ranges:
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else end
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(content)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+
+        body = content[start : end + 1]
+        if self.server.failures:
+            # Drop the connection part way through the response
+            self.server.failures -= 1
+            body = body[: len(body) // 2]
+        self.wfile.write(body)
+
+
+@pytest.fixture()
+def http_server(requests_mock, mocker):
+    requests_mock.real_http = True
+    mocker.patch("bookshelf.utils.time.sleep")
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _RangeRequestHandler)
+    server.content = bytes(range(256)) * 1000
+    server.support_ranges = True
+    server.head_status = 200
+    server.failures = 0
+    server.ranges = []
+    server.url = f"http://127.0.0.1:{server.server_port}/file.bin"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_download(tmp_path, http_server, sha256):
+    local_fname = tmp_path / "downloads" / "file.bin"
+    download(http_server.url, local_fname, known_hash=sha256(http_server.content))
+
+    assert local_fname.read_bytes() == http_server.content
+    assert http_server.ranges == [None]
+    assert [f.name for f in local_fname.parent.iterdir()] == ["file.bin"]
+
+
+def test_download_resume(tmp_path, http_server, sha256):
+    http_server.failures = 1
+    local_fname = tmp_path / "downloads" / "file.bin"
+
+    download(http_server.url, local_fname, known_hash=sha256(http_server.content), retry_count=1)
+
+    assert local_fname.read_bytes() == http_server.content
+    assert http_server.ranges == [None, f"bytes={DOWNLOAD_CHUNK_SIZE}-"]
+
+
+def test_download_resume_unsupported(tmp_path, http_server, sha256):
+    http_server.failures = 1
+    http_server.support_ranges = False
+    local_fname = tmp_path / "downloads" / "file.bin"
+
+    download(http_server.url, local_fname, known_hash=sha256(http_server.content), retry_count=1)
+
+    assert local_fname.read_bytes() == http_server.content
+
+
+def test_download_resume_previous_failure(tmp_path, http_server, sha256):
+    http_server.failures = 1
+    local_fname = tmp_path / "downloads" / "file.bin"
+    known_hash = sha256(http_server.content)
+
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        download(http_server.url, local_fname, known_hash=known_hash)
+    assert not local_fname.exists()
+
+    download(http_server.url, local_fname, known_hash=known_hash)
+    assert local_fname.read_bytes() == http_server.content
+    assert http_server.ranges[-1] == f"bytes={DOWNLOAD_CHUNK_SIZE}-"
+
+
+def test_download_segments(tmp_path, http_server, monkeypatch, sha256):
+    monkeypatch.setattr("bookshelf.utils.DOWNLOAD_MIN_SEGMENT_SIZE", 1000)
+    http_server.failures = 1
+    local_fname = tmp_path / "downloads" / "file.bin"
+
+    download(
+        http_server.url,
+        local_fname,
+        known_hash=sha256(http_server.content),
+        segments=4,
+        retry_count=1,
+    )
+
+    assert local_fname.read_bytes() == http_server.content
+    assert len(http_server.ranges) == 5
+    assert "bytes=0-63999" in http_server.ranges
+
+
+def test_download_segments_head_not_allowed(tmp_path, http_server, monkeypatch, sha256):
+    monkeypatch.setattr("bookshelf.utils.DOWNLOAD_MIN_SEGMENT_SIZE", 1000)
+    http_server.head_status = 405
+    local_fname = tmp_path / "downloads" / "file.bin"
+
+    download(http_server.url, local_fname, known_hash=sha256(http_server.content), segments=4)
+
+    assert local_fname.read_bytes() == http_server.content
+    assert http_server.ranges == [None]
+
+
+def test_download_hash_mismatch(tmp_path, http_server, sha256):
+    local_fname = tmp_path / "downloads" / "file.bin"
+
+    with pytest.raises(ValueError, match="SHA256 hash of downloaded file"):
+        download(http_server.url, local_fname, known_hash=sha256(b"other"))
+    assert list(local_fname.parent.iterdir()) == []
+
+
+def test_download_file_url(tmp_path, sha256):
+    source = tmp_path / "remote" / "file.bin"
+    source.parent.mkdir()
+    source.write_bytes(b"content")
+    local_fname = tmp_path / "downloads" / "file.bin"
+
+    download(source.as_uri(), local_fname)
+    assert local_fname.read_bytes() == b"content"
+    assert not local_fname.samefile(source)
+
+    with pytest.raises(ValueError, match="SHA256 hash of downloaded file"):
+        download(source.as_uri(), local_fname, known_hash=sha256(b"other"), progressbar=True)
+    with pytest.raises(FileNotFoundError):
+        download((tmp_path / "missing.bin").as_uri(), local_fname)
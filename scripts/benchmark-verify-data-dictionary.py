@@ -0,0 +1,113 @@
+"""
+Benchmark the verification of a dataset against a data dictionary
+
+Builds a synthetic ScmRun with a large number of timeseries
+and times [verify_data_dictionary][bookshelf.dataset_structure.verify_data_dictionary].
+
+Usage: `python scripts/benchmark-verify-data-dictionary.py --timeseries 1000000`
+"""
+
+import argparse
+import time
+
+import numpy as np
+import scmdata
+
+from bookshelf.dataset_structure import verify_data_dictionary
+from bookshelf.schema import NotebookMetadata
+
+REGIONS = [f"R{i:03}" for i in range(250)]
+VARIABLES = [f"Emissions|Gas {i}" for i in range(200)]
+
+
+def build_data(n_timeseries: int) -> scmdata.ScmRun:
+    """
+    Build a synthetic dataset
+
+    Parameters
+    ----------
+    n_timeseries
+        Number of timeseries in the dataset
+
+    Returns
+    -------
+    :
+        Dataset with two timesteps
+    """
+    rng = np.random.default_rng(0)
+    return scmdata.ScmRun(
+        rng.random((2, n_timeseries)),
+        index=[2020, 2030],
+        columns={
+            "model": "benchmark",
+            "scenario": [f"scenario {i}" for i in range(n_timeseries)],
+            "region": [REGIONS[i] for i in rng.integers(len(REGIONS), size=n_timeseries)],
+            "variable": [VARIABLES[i] for i in rng.integers(len(VARIABLES), size=n_timeseries)],
+            "unit": "Mt / yr",
+        },
+    )
+
+
+def build_config() -> NotebookMetadata:
+    """
+    Build a notebook configuration with a data dictionary for the synthetic dataset
+
+    One region is missing from the controlled vocabulary so a violation is reported.
+
+    Returns
+    -------
+    :
+        Notebook configuration
+    """
+    dimensions = [
+        {"name": name, "description": name, "type": "string", "allowed_NA": False}
+        for name in ["model", "scenario", "variable", "unit"]
+    ]
+    dimensions.append(
+        {
+            "name": "region",
+            "description": "region",
+            "type": "string",
+            "allowed_NA": False,
+            "controlled_vocabulary": [{"value": region, "description": region} for region in REGIONS[1:]],
+        }
+    )
+    return NotebookMetadata(
+        name="benchmark",
+        version="v1.0.0",
+        edition=1,
+        license="unspecified",
+        source_file="",
+        private=False,
+        metadata={},
+        dataset={"author": "benchmark", "files": []},
+        data_dictionary=dimensions,
+    )
+
+
+def main() -> None:
+    """
+    Run the benchmark
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--timeseries", type=int, default=1_000_000, help="Number of timeseries")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of times to repeat the verification")
+    args = parser.parse_args()
+
+    data = build_data(args.timeseries)
+    config = build_config()
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        verification = verify_data_dictionary(data, config)
+        timings.append(time.perf_counter() - start)
+
+    print(f"Verified {args.timeseries} timeseries in {min(timings):.3f}s (best of {args.repeat})")
+    if verification is not None:
+        for violation in verification.violations:
+            print(f"  {violation}")
+
+
+if __name__ == "__main__":
+    main()